@@ -1,8 +1,10 @@
 from microdata_tools.packaging import package_dataset, unpackage_dataset
 from microdata_tools.validation import (
+    IngestionOptions,
     get_unit_id_type_for_unit_type,
     validate_dataset,
     validate_metadata,
+    validate_table,
 )
 
 __all__ = [
@@ -10,5 +12,7 @@ __all__ = [
     "unpackage_dataset",
     "validate_dataset",
     "validate_metadata",
+    "validate_table",
     "get_unit_id_type_for_unit_type",
+    "IngestionOptions",
 ]
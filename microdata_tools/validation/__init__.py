@@ -1,12 +1,19 @@
+import copy
+import logging
 import string
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, List, Union
 
 import pyarrow
 
 from microdata_tools.validation.adapter import local_storage
+from microdata_tools.validation.adapter.conversion_cache import (
+    DEFAULT_CACHE_MAX_BYTES,
+    ConversionCache,
+)
 from microdata_tools.validation.components import unit_id_types
 from microdata_tools.validation.exceptions import ValidationError
+from microdata_tools.validation.model.ingestion import IngestionOptions
 from microdata_tools.validation.model.metadata import UnitIdType, UnitType
 from microdata_tools.validation.steps import (
     data_reader,
@@ -15,6 +22,8 @@ from microdata_tools.validation.steps import (
     metadata_reader,
 )
 
+logger = logging.getLogger()
+
 
 def _validate_dataset_name(dataset_name: str) -> None:
     """
@@ -35,6 +44,11 @@ def _validate_dataset_name(dataset_name: str) -> None:
         )
 
 
+def _validate_max_errors(max_errors: int) -> None:
+    if max_errors < 1:
+        raise ValueError(f"max_errors must be at least 1, got {max_errors}")
+
+
 def get_unit_id_type_for_unit_type(
     unit_id: UnitType,
 ) -> Union[None, UnitIdType]:
@@ -51,11 +65,40 @@ def validate_dataset(
     working_directory: str = "",
     input_directory: str = "",
     keep_temporary_files: bool = False,
+    max_errors: int = 50,
+    ingestion_options: Union[IngestionOptions, None] = None,
+    workers: int = 1,
+    cache_directory: str = "",
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    memory_limit: Union[int, None] = None,
+    bloom_filter_false_positive_rate: Union[float, None] = None,
 ) -> List[str]:
     """
     Validate a dataset and return a list of errors.
     If the dataset is valid, the list will be empty.
+    At most max_errors errors are reported for the first failing check.
+    The reading of the CSV file can be tuned with ingestion_options.
+    With more than one worker, the checks that compare rows with each
+    other run in that many processes, when the data is partitioned or
+    sorted with the ingestion_options. The processes are spawned, so a
+    script that calls this function with workers must do so under an
+    if __name__ == "__main__": guard.
+    With a cache_directory, the sanitized data of an unchanged CSV file
+    is reused from the cache instead of reading the CSV file again. The
+    least recently used data is evicted from the cache when it grows
+    beyond cache_max_bytes.
+    With a memory_limit in bytes, the checks that compare rows with each
+    other split the data into temporary files in the working directory,
+    and check them one at a time, when they are estimated to need more
+    memory than the limit. The peak usage of the Arrow memory pool is
+    logged when the validation ends.
+    With a bloom_filter_false_positive_rate, the identifiers of a FIXED
+    dataset are passed through a Bloom filter while the CSV file is
+    read, and only the identifiers it flags as possible duplicates are
+    checked for uniqueness afterwards.
+    Raises a ValueError if max_errors is less than 1.
     """
+    _validate_max_errors(max_errors)
     data_errors = []
     working_directory_path = None
     working_directory_was_generated = False
@@ -69,7 +112,9 @@ def validate_dataset(
         ) = local_storage.resolve_working_directory(working_directory)
         input_dataset_directory = Path(input_directory) / dataset_name
         input_metadata_path = input_dataset_directory / f"{dataset_name}.json"
-        input_data_path = input_dataset_directory / f"{dataset_name}.csv"
+        input_data_path = local_storage.find_csv_file(
+            input_dataset_directory, dataset_name
+        )
         # Read and validate metadata
         metadata_dict = metadata_reader.run_reader(
             dataset_name, input_metadata_path
@@ -86,19 +131,84 @@ def validate_dataset(
             "sentinelAndMissingValues"
         )
 
-        # Read data
-        parquet_path = working_directory_path / f"{dataset_name}.parquet"
-        filesystem_dataset = data_reader.read_and_sanitize_csv_write_parquet(
-            input_data_path,
-            parquet_path,
-            identifier_data_type,
-            measure_data_type,
-            temporality_type,
+        ingestion_options = ingestion_options or IngestionOptions()
+        parquet_path = (
+            working_directory_path
+            / f"{dataset_name}.{ingestion_options.file_format}"
         )
+        conversion_cache = (
+            ConversionCache(Path(cache_directory), cache_max_bytes)
+            if cache_directory
+            else None
+        )
+        cached_temporal_statistics = None
+        unit_id_bloom_filter = None
+        if conversion_cache is not None:
+            cache_key = conversion_cache.key(
+                input_data_path,
+                identifier_data_type,
+                measure_data_type,
+                temporality_type,
+                ingestion_options,
+            )
+            cached_temporal_statistics = conversion_cache.get(
+                cache_key, parquet_path
+            )
+
+        if cached_temporal_statistics is not None:
+            # Reuse the cached data, and run the row level checks on it,
+            # as the metadata they depend on may have changed
+            row_level_validator = None
+            temporal_statistics = data_reader.TemporalStatistics.from_dict(
+                cached_temporal_statistics
+            )
+            filesystem_dataset = data_reader.open_intermediate_dataset(
+                parquet_path, ingestion_options.file_format
+            )
+        else:
+            # Read data and run the row level checks and collect the
+            # temporal coverage while it is ingested
+            row_level_validator = dataset_validator.RowLevelValidator(
+                measure_data_type,
+                code_list,
+                sentinel_list,
+                temporality_type,
+                max_errors,
+            )
+            temporal_statistics = data_reader.TemporalStatistics(
+                temporality_type
+            )
+            batch_consumers = [
+                row_level_validator.validate_batch,
+                temporal_statistics.update,
+            ]
+            if (
+                bloom_filter_false_positive_rate is not None
+                and temporality_type == "FIXED"
+            ):
+                unit_id_bloom_filter = data_reader.UnitIdBloomFilter(
+                    bloom_filter_false_positive_rate
+                )
+                batch_consumers.append(unit_id_bloom_filter.update)
+            filesystem_dataset = (
+                data_reader.read_and_sanitize_csv_write_parquet(
+                    input_data_path,
+                    parquet_path,
+                    identifier_data_type,
+                    measure_data_type,
+                    temporality_type,
+                    batch_consumers=batch_consumers,
+                    ingestion_options=ingestion_options,
+                )
+            )
+            if conversion_cache is not None:
+                conversion_cache.put(
+                    cache_key, parquet_path, temporal_statistics.to_dict()
+                )
 
         # Enrich metadata with temporal data
         temporal_data = data_reader.get_temporal_data(
-            filesystem_dataset, temporality_type
+            filesystem_dataset, temporality_type, temporal_statistics
         )
         metadata_enricher.enrich_with_temporal_coverage(
             metadata_dict, temporal_data
@@ -111,11 +221,17 @@ def validate_dataset(
 
         # Validate data
         dataset_validator.validate_dataset(
-            pyarrow.dataset.dataset(parquet_path),
+            filesystem_dataset,
             measure_data_type,
             code_list,
             sentinel_list,
             temporality_type,
+            max_errors=max_errors,
+            row_level_validator=row_level_validator,
+            workers=workers,
+            memory_limit=memory_limit,
+            spill_directory=working_directory_path / f"{dataset_name}.spill",
+            unit_id_bloom_filter=unit_id_bloom_filter,
         )
     except ValidationError as e:
         data_errors = e.errors
@@ -130,6 +246,79 @@ def validate_dataset(
                 working_directory_path,
                 delete_working_directory=working_directory_was_generated,
             )
+        logger.info(
+            "Peak Arrow memory pool usage: "
+            f"{pyarrow.default_memory_pool().max_memory() / 1_000_000:.1f} MB"
+        )
+    return data_errors
+
+
+def validate_table(
+    metadata_dict: Dict,
+    data: Union[pyarrow.Table, pyarrow.RecordBatchReader],
+    max_errors: int = 50,
+) -> List[str]:
+    """
+    Validate data that is already held as a pyarrow.Table or
+    RecordBatchReader against a metadata dictionary, and return a list
+    of errors. If the dataset is valid, the list will be empty.
+    The data must have the columns unit_id, value, start and stop. It is
+    sanitized and validated in memory, without writing any files.
+    The metadata_dict is not modified.
+    Raises a ValueError if max_errors is less than 1.
+    """
+    _validate_max_errors(max_errors)
+    data_errors = []
+    try:
+        metadata_dict = metadata_reader.read_metadata_dict(
+            copy.deepcopy(metadata_dict)
+        )
+        measure_data_type = metadata_dict["measureVariables"][0]["dataType"]
+        identifier_data_type = metadata_dict["identifierVariables"][0][
+            "dataType"
+        ]
+        temporality_type = metadata_dict["temporalityType"]
+        code_list = metadata_dict["measureVariables"][0]["valueDomain"].get(
+            "codeList"
+        )
+        sentinel_list = metadata_dict["measureVariables"][0]["valueDomain"].get(
+            "sentinelAndMissingValues"
+        )
+        row_level_validator = dataset_validator.RowLevelValidator(
+            measure_data_type,
+            code_list,
+            sentinel_list,
+            temporality_type,
+            max_errors,
+        )
+        temporal_statistics = data_reader.TemporalStatistics(temporality_type)
+        in_memory_dataset = data_reader.read_and_sanitize_table(
+            data,
+            identifier_data_type,
+            measure_data_type,
+            temporality_type,
+            batch_consumers=[
+                row_level_validator.validate_batch,
+                temporal_statistics.update,
+            ],
+        )
+        temporal_data = data_reader.get_temporal_data(
+            in_memory_dataset, temporality_type, temporal_statistics
+        )
+        metadata_enricher.enrich_with_temporal_coverage(
+            metadata_dict, temporal_data
+        )
+        dataset_validator.validate_dataset(
+            in_memory_dataset,
+            measure_data_type,
+            code_list,
+            sentinel_list,
+            temporality_type,
+            max_errors=max_errors,
+            row_level_validator=row_level_validator,
+        )
+    except ValidationError as e:
+        data_errors = e.errors
     return data_errors
 
 
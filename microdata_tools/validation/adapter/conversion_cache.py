@@ -0,0 +1,214 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from importlib import metadata
+from pathlib import Path
+from typing import List, Union
+
+from microdata_tools.validation.model.ingestion import IngestionOptions
+
+logger = logging.getLogger()
+
+DEFAULT_CACHE_MAX_BYTES = 10 * 1024 * 1024 * 1024
+HASH_CHUNK_BYTES = 8 * 1024 * 1024
+CONTENT_HASHES_DIRECTORY = "content_hashes"
+TEMPORAL_STATISTICS_FILE = "temporal_statistics.json"
+
+
+def _library_version() -> str:
+    try:
+        return metadata.version("microdata-tools")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    """
+    Hard links a file, or copies it if the source and destination are
+    on different file systems.
+    """
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def _link_or_copy_data(source: Path, destination: Path) -> None:
+    if destination.is_dir():
+        shutil.rmtree(destination)
+    elif destination.exists():
+        os.remove(destination)
+    if source.is_dir():
+        shutil.copytree(source, destination, copy_function=_link_or_copy)
+    else:
+        _link_or_copy(str(source), str(destination))
+
+
+def _size_in_bytes(path: Path) -> int:
+    return sum(
+        file.stat().st_size for file in path.rglob("*") if file.is_file()
+    )
+
+
+class ConversionCache:
+    """
+    A persistent cache of the sanitized data written from a csv file,
+    and the temporal statistics collected while it was written. Entries
+    are keyed on the content hash, size and modification time of the
+    csv file, the data types, the temporality type, the layout of the
+    written data and the library version. The least recently used
+    entries are evicted when the cache grows beyond max_bytes.
+    The content hash of a csv file is remembered for its path, size and
+    modification time, so an unchanged csv file is only read once. The
+    remembered content hashes count toward max_bytes, and are evicted
+    with the entries.
+    """
+
+    def __init__(
+        self, cache_directory: Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+    ) -> None:
+        self.cache_directory = cache_directory
+        self.max_bytes = max_bytes
+        os.makedirs(
+            self.cache_directory / CONTENT_HASHES_DIRECTORY, exist_ok=True
+        )
+
+    def _content_hash(self, csv_path: Path) -> str:
+        stat = csv_path.stat()
+        content_hash_path = (
+            self.cache_directory
+            / CONTENT_HASHES_DIRECTORY
+            / hashlib.sha256(
+                f"{csv_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+            ).hexdigest()
+        )
+        if content_hash_path.exists():
+            os.utime(content_hash_path)
+            return content_hash_path.read_text(encoding="utf-8")
+        content_hash = hashlib.sha256()
+        with open(csv_path, "rb") as f:
+            while chunk := f.read(HASH_CHUNK_BYTES):
+                content_hash.update(chunk)
+        content_hash_path.write_text(content_hash.hexdigest(), encoding="utf-8")
+        return content_hash.hexdigest()
+
+    def key(
+        self,
+        csv_path: Path,
+        identifier_data_type: str,
+        measure_data_type: str,
+        temporality_type: str,
+        ingestion_options: IngestionOptions,
+    ) -> str:
+        stat = csv_path.stat()
+        return hashlib.sha256(
+            json.dumps(
+                {
+                    "content_hash": self._content_hash(csv_path),
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "identifier_data_type": identifier_data_type,
+                    "measure_data_type": measure_data_type,
+                    "temporality_type": temporality_type,
+                    "sort_by_unit_id": ingestion_options.sort_by_unit_id,
+                    "partition_count": ingestion_options.partition_count,
+                    "file_format": ingestion_options.file_format,
+                    "pack_digit_identifiers": (
+                        ingestion_options.pack_digit_identifiers
+                    ),
+                    "version": _library_version(),
+                },
+                sort_keys=True,
+            ).encode()
+        ).hexdigest()
+
+    def get(self, key: str, output_path: Path) -> Union[dict, None]:
+        """
+        Links the cached data of the key to output_path, and returns the
+        cached temporal statistics. Returns None on a cache miss.
+        """
+        entry_directory = self.cache_directory / key
+        statistics_path = entry_directory / TEMPORAL_STATISTICS_FILE
+        if not statistics_path.exists():
+            return None
+        _link_or_copy_data(
+            entry_directory / f"data{output_path.suffix}", output_path
+        )
+        os.utime(statistics_path)
+        logger.info(f"Reusing the sanitized data cached in {entry_directory}")
+        with open(statistics_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, key: str, data_path: Path, temporal_statistics: dict) -> None:
+        """
+        Stores the data written to data_path and its temporal statistics
+        under the key, and evicts the least recently used entries.
+        """
+        entry_directory = self.cache_directory / key
+        if entry_directory.exists():
+            return
+        temporary_directory = self.cache_directory / f".tmp-{uuid.uuid4()}"
+        os.makedirs(temporary_directory)
+        try:
+            _link_or_copy_data(
+                data_path, temporary_directory / f"data{data_path.suffix}"
+            )
+            with open(
+                temporary_directory / TEMPORAL_STATISTICS_FILE,
+                "w",
+                encoding="utf-8",
+            ) as f:
+                json.dump(temporal_statistics, f)
+            try:
+                os.rename(temporary_directory, entry_directory)
+            except OSError:
+                # Another process stored the same entry first
+                if not entry_directory.exists():
+                    raise
+        finally:
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+        self.evict()
+
+    def _entries(self) -> List[Path]:
+        return [
+            path
+            for path in self.cache_directory.iterdir()
+            if path.is_dir()
+            and path.name != CONTENT_HASHES_DIRECTORY
+            and not path.name.startswith(".")
+            and (path / TEMPORAL_STATISTICS_FILE).exists()
+        ]
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries and content hashes until
+        the cache holds at most max_bytes bytes.
+        """
+        cached_paths = [
+            (
+                (entry / TEMPORAL_STATISTICS_FILE).stat().st_mtime,
+                entry,
+                _size_in_bytes(entry),
+            )
+            for entry in self._entries()
+        ]
+        for content_hash_path in (
+            self.cache_directory / CONTENT_HASHES_DIRECTORY
+        ).iterdir():
+            stat = content_hash_path.stat()
+            cached_paths.append(
+                (stat.st_mtime, content_hash_path, stat.st_size)
+            )
+        cached_paths.sort(key=lambda cached_path: cached_path[0])
+        total_bytes = sum(size for _, _, size in cached_paths)
+        for _, path, size in cached_paths:
+            if total_bytes <= self.max_bytes:
+                break
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+            total_bytes -= size
@@ -4,12 +4,14 @@ import os
 import shutil
 import uuid
 from pathlib import Path
-from typing import Tuple, Union
+from typing import List, Tuple, Union
 
 from microdata_tools.validation.exceptions import ValidationError
 
 logger = logging.getLogger()
 
+CSV_SUFFIXES = [".csv", ".csv.gz", ".csv.bz2", ".csv.zst"]
+
 
 def load_json(filepath: Path) -> dict:
     try:
@@ -25,6 +27,18 @@ def write_json(filepath: Path, content: dict) -> None:
         json.dump(content, json_file, indent=4, ensure_ascii=False)
 
 
+def find_csv_file(dataset_dir: Path, dataset_name: str) -> Union[Path, None]:
+    """
+    Returns the path of the csv file of the dataset, which may be
+    compressed with gzip, bz2 or zstd. Returns None if there is none.
+    """
+    for suffix in CSV_SUFFIXES:
+        csv_path = dataset_dir / f"{dataset_name}{suffix}"
+        if csv_path.exists():
+            return csv_path
+    return None
+
+
 def validate_dataset_dir(
     input_dir: Path, dataset_name: str, require_csv: bool = True
 ) -> None:
@@ -35,7 +49,7 @@ def validate_dataset_dir(
             errors=[f"Dataset directory {dataset_dir} not found"],
         )
     if require_csv:
-        if not os.path.exists(dataset_dir / f"{dataset_name}.csv"):
+        if find_csv_file(dataset_dir, dataset_name) is None:
             raise ValidationError(
                 f"Could not find {dataset_name}.csv in working directory",
                 errors=[
@@ -66,19 +80,49 @@ def resolve_working_directory(
         return generated_working_directory, True
 
 
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+def _remove_generated_files(
+    generated_files: List[str],
+    generated_data_files: List[str],
+    working_directory: Path,
+) -> None:
+    """
+    Removes the generated files and generated data files that exist.
+    The data is written in one of several formats, and a validation
+    that failed while reading the data may not have written all files.
+    """
+    for file in generated_files + generated_data_files:
+        if os.path.lexists(working_directory / file):
+            _remove(working_directory / file)
+
+
 def clean_up_temporary_files(
     dataset_name: str,
     working_directory: Path,
     delete_working_directory: bool = False,
 ) -> None:
-    generated_files = [
+    generated_data_files = [
         f"{dataset_name}.parquet",
-        f"{dataset_name}.json",
+        f"{dataset_name}.arrow",
     ]
+    generated_files = [f"{dataset_name}.json"]
+    # Files spilled by checks that exceed the memory limit are removed
+    # by the checks, unless they were interrupted
+    spill_directory = working_directory / f"{dataset_name}.spill"
+    if spill_directory.exists():
+        shutil.rmtree(spill_directory)
     if delete_working_directory:
         temporary_files = os.listdir(working_directory)
         unknown_files = [
-            file for file in temporary_files if file not in generated_files
+            file
+            for file in temporary_files
+            if file not in generated_files + generated_data_files
         ]
         if not unknown_files:
             try:
@@ -90,22 +134,10 @@ def clean_up_temporary_files(
                 )
                 raise e
         else:
-            for file in generated_files:
-                try:
-                    os.remove(working_directory / file)
-                except FileNotFoundError as e:
-                    logger.error(
-                        f"Could not find file {file} in working directory "
-                        "when attempting to delete temporary files."
-                    )
-                    raise e
+            _remove_generated_files(
+                generated_files, generated_data_files, working_directory
+            )
     else:
-        for file in generated_files:
-            try:
-                os.remove(working_directory / file)
-            except FileNotFoundError as e:
-                logger.error(
-                    f"Could not find file {file} in working directory "
-                    "when attempting to delete temporary files."
-                )
-                raise e
+        _remove_generated_files(
+            generated_files, generated_data_files, working_directory
+        )
@@ -0,0 +1,65 @@
+import os
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+MIN_AUTO_BLOCK_SIZE = 1024 * 1024
+MAX_AUTO_BLOCK_SIZE = 64 * 1024 * 1024
+MAX_AUTO_IO_THREAD_COUNT = 8
+AUTO_BLOCKS_PER_CORE = 8
+DEFAULT_SORT_RUN_ROWS = 4 * 1024 * 1024
+
+
+class IngestionOptions(BaseModel, extra="forbid"):
+    """
+    Tuning of the CSV ingestion. Values that are not set keep the
+    pyarrow defaults. With auto=True, the values that are not set are
+    picked from the size of the CSV file and the number of cores.
+    With sort_by_unit_id=True, the intermediate parquet file is sorted
+    by unit_id and start date, holding at most sort_run_rows rows in
+    memory while sorting. With a partition_count above 1, the
+    intermediate data is split over that many parquet files by a hash
+    of unit_id. With file_format="arrow", the intermediate data is
+    written as uncompressed Arrow IPC, which is memory-mapped when read.
+    With pack_digit_identifiers=True, STRING identifiers that are all
+    digits of the same width are written as int64, and the width is
+    kept to restore their leading zeros. The identifiers are written as
+    strings if any of them is not.
+    """
+
+    auto: bool = False
+    block_size: Optional[int] = Field(default=None, gt=0)
+    use_threads: bool = True
+    cpu_count: Optional[int] = Field(default=None, gt=0)
+    io_thread_count: Optional[int] = Field(default=None, gt=0)
+    sort_by_unit_id: bool = False
+    sort_run_rows: int = Field(default=DEFAULT_SORT_RUN_ROWS, gt=0)
+    partition_count: int = Field(default=1, gt=0)
+    file_format: Literal["parquet", "arrow"] = "parquet"
+    pack_digit_identifiers: bool = False
+
+    def resolve(self, file_size: int) -> "IngestionOptions":
+        """
+        Returns the options to use for a CSV file of file_size bytes.
+        In auto mode the block size is chosen so that every core gets
+        several blocks to parse, within 1 MiB and 64 MiB. For a
+        compressed CSV file, file_size is the estimated uncompressed
+        size.
+        """
+        if not self.auto:
+            return self
+        core_count = os.cpu_count() or 1
+        block_size = file_size // (core_count * AUTO_BLOCKS_PER_CORE)
+        return self.model_copy(
+            update={
+                "auto": False,
+                "block_size": self.block_size
+                or min(
+                    max(block_size, MIN_AUTO_BLOCK_SIZE), MAX_AUTO_BLOCK_SIZE
+                ),
+                "use_threads": self.use_threads and core_count > 1,
+                "cpu_count": self.cpu_count or core_count,
+                "io_thread_count": self.io_thread_count
+                or min(core_count, MAX_AUTO_IO_THREAD_COUNT),
+            }
+        )
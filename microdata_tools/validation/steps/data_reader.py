@@ -1,18 +1,50 @@
 # pyright: reportAttributeAccessIssue=false
 import logging
+import math
+import os
+import shutil
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Callable, Dict, Iterator, List, Tuple, Union
 
+import numpy
 import pyarrow
 import pyarrow.dataset
 import pyarrow.dataset as ds
-from pyarrow import ArrowInvalid, compute, csv, parquet
+from pyarrow import (
+    ArrowInvalid,
+    ArrowNotImplementedError,
+    compute,
+    csv,
+    fs,
+    ipc,
+    parquet,
+)
 
 from microdata_tools.validation.exceptions import ValidationError
+from microdata_tools.validation.model.ingestion import IngestionOptions
 
 logger = logging.getLogger()
 
+DEFAULT_ROW_GROUP_ROWS = 1024 * 1024
+DEFAULT_ROW_GROUP_BYTES = 128 * 1024 * 1024
+DICTIONARY_PAGE_BYTES = 64 * 1024 * 1024
+SORTED_BY_METADATA_KEY = "microdata_tools.sorted_by"
+PARTITIONED_BY_METADATA_KEY = "microdata_tools.partitioned_by"
+PARTITION_COUNT_METADATA_KEY = "microdata_tools.partition_count"
+IDENTIFIER_WIDTH_METADATA_KEY = "microdata_tools.identifier_width"
+MAX_PACKED_IDENTIFIER_WIDTH = 18
+SORT_KEYS = [("unit_id", "ascending"), ("start_epoch_days", "ascending")]
+COMPRESSION_MAGIC_BYTES = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+COMPRESSION_SAMPLE_BYTES = 4 * 1024 * 1024
+
 
 def _microdata_data_type_to_pyarrow(
     microdata_data_type: str,
@@ -50,12 +82,91 @@ def _microdata_data_type_to_disk_pyarrow(
         )
 
 
-def _get_csv_read_options() -> csv.ReadOptions:
-    return csv.ReadOptions(
-        column_names=["unit_id", "value", "start", "stop", "attributes"]
+def _get_csv_read_options(
+    ingestion_options: IngestionOptions,
+) -> csv.ReadOptions:
+    read_options = csv.ReadOptions(
+        column_names=["unit_id", "value", "start", "stop", "attributes"],
+        use_threads=ingestion_options.use_threads,
+    )
+    if ingestion_options.block_size is not None:
+        read_options.block_size = ingestion_options.block_size
+    return read_options
+
+
+def _csv_compression(input_csv_path: Path) -> Union[str, None]:
+    """
+    Detects gzip, bz2 and zstd compressed csv files from the magic bytes
+    at the start of the file, regardless of the file extension.
+    """
+    with open(input_csv_path, "rb") as f:
+        magic_bytes = f.read(4)
+    for compression, magic in COMPRESSION_MAGIC_BYTES.items():
+        if magic_bytes.startswith(magic):
+            return compression
+    return None
+
+
+def _open_csv_input(
+    exit_stack: ExitStack, input_csv_path: Path
+) -> Union[Path, pyarrow.NativeFile]:
+    """
+    Returns the csv path, or a stream that decompresses a compressed csv
+    file while it is read.
+    """
+    compression = _csv_compression(input_csv_path)
+    if compression is None:
+        return input_csv_path
+    return exit_stack.enter_context(
+        pyarrow.CompressedInputStream(
+            exit_stack.enter_context(pyarrow.OSFile(str(input_csv_path))),
+            compression,
+        )
     )
 
 
+def _estimated_csv_size(input_csv_path: Path) -> int:
+    """
+    Returns the size of the csv file in bytes. The size of a compressed
+    csv file is estimated from the compression ratio of its first
+    COMPRESSION_SAMPLE_BYTES decompressed bytes.
+    """
+    file_size = os.path.getsize(input_csv_path)
+    compression = _csv_compression(input_csv_path)
+    if compression is None:
+        return file_size
+    with (
+        pyarrow.OSFile(str(input_csv_path)) as compressed_file,
+        pyarrow.CompressedInputStream(
+            compressed_file, compression
+        ) as csv_stream,
+    ):
+        sample_size = len(csv_stream.read(COMPRESSION_SAMPLE_BYTES))
+        compressed_sample_size = compressed_file.tell()
+    return int(file_size * sample_size / max(compressed_sample_size, 1))
+
+
+@contextmanager
+def _pyarrow_thread_pools(
+    ingestion_options: IngestionOptions,
+) -> Iterator[None]:
+    """
+    Resizes the pyarrow CPU and IO thread pools for the duration of the
+    ingestion, and restores the previous sizes afterwards.
+    """
+    previous_cpu_count = pyarrow.cpu_count()
+    previous_io_thread_count = pyarrow.io_thread_count()
+    if ingestion_options.cpu_count is not None:
+        pyarrow.set_cpu_count(ingestion_options.cpu_count)
+    if ingestion_options.io_thread_count is not None:
+        pyarrow.set_io_thread_count(ingestion_options.io_thread_count)
+    try:
+        yield
+    finally:
+        pyarrow.set_cpu_count(previous_cpu_count)
+        pyarrow.set_io_thread_count(previous_io_thread_count)
+
+
 def _get_csv_convert_options(
     identifier_data_type: str, measure_data_type: str
 ) -> csv.ConvertOptions:
@@ -74,35 +185,904 @@ def _get_csv_convert_options(
     )
 
 
+class _IpcWriter:
+    """
+    Writes an uncompressed Arrow IPC file through the part of the
+    ParquetWriter interface that is used while ingesting. pyarrow only
+    takes the footer metadata of an IPC file when it is opened, so
+    metadata added while writing is stored in the custom metadata of an
+    empty record batch at the end of the file.
+    """
+
+    def __init__(self, path: Path, schema: pyarrow.Schema) -> None:
+        self.schema = schema
+        self.key_value_metadata: Dict[str, str] = {}
+        self.writer = ipc.new_file(
+            str(path), schema, options=ipc.IpcWriteOptions(compression=None)
+        )
+
+    def write_table(self, table: pyarrow.Table, row_group_size: int) -> None:
+        self.writer.write_table(table, max_chunksize=row_group_size)
+
+    def add_key_value_metadata(
+        self, key_value_metadata: Dict[str, str]
+    ) -> None:
+        self.key_value_metadata.update(key_value_metadata)
+
+    def close(self) -> None:
+        if self.key_value_metadata:
+            self.writer.write_batch(
+                pyarrow.RecordBatch.from_pylist([], schema=self.schema),
+                custom_metadata=self.key_value_metadata,
+            )
+        self.writer.close()
+
+    def __enter__(self) -> "_IpcWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class _RowGroupWriter:
+    """
+    Buffers sanitized tables and writes them as row groups of
+    row_group_rows rows, or as soon as the buffered tables hold
+    row_group_bytes bytes. Writing every CSV reader batch as its own row
+    group would leave thousands of tiny row groups in the file.
+    """
+
+    def __init__(
+        self,
+        writer: Union[pyarrow.parquet.ParquetWriter, _IpcWriter],
+        row_group_rows: int,
+        row_group_bytes: int,
+    ) -> None:
+        self.writer = writer
+        self.row_group_rows = row_group_rows
+        self.row_group_bytes = row_group_bytes
+        self.buffered_tables: List[pyarrow.Table] = []
+        self.buffered_rows = 0
+        self.buffered_bytes = 0
+
+    def write_table(self, table: pyarrow.Table) -> None:
+        self.buffered_tables.append(table)
+        self.buffered_rows += table.num_rows
+        self.buffered_bytes += table.nbytes
+        if self.buffered_rows >= self.row_group_rows:
+            buffered_table = pyarrow.concat_tables(self.buffered_tables)
+            full_row_groups_rows = (
+                self.buffered_rows // self.row_group_rows
+            ) * self.row_group_rows
+            self.writer.write_table(
+                buffered_table.slice(0, full_row_groups_rows),
+                row_group_size=self.row_group_rows,
+            )
+            remainder = buffered_table.slice(full_row_groups_rows)
+            self.buffered_tables = [remainder]
+            self.buffered_rows = remainder.num_rows
+            self.buffered_bytes = remainder.nbytes
+        elif self.buffered_bytes >= self.row_group_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffered_rows > 0:
+            self.writer.write_table(
+                pyarrow.concat_tables(self.buffered_tables),
+                row_group_size=self.buffered_rows,
+            )
+        self.buffered_tables = []
+        self.buffered_rows = 0
+        self.buffered_bytes = 0
+
+
+def _parquet_writer(
+    parquet_path: Path, schema: pyarrow.Schema
+) -> parquet.ParquetWriter:
+    """
+    Opens a parquet writer that dictionary-encodes every column. The
+    dictionary page limit is raised from the 1 MB default, so that
+    columns with many distinct identifiers stay dictionary-encoded
+    within a row group instead of falling back to plain encoding.
+    """
+    return parquet.ParquetWriter(
+        parquet_path,
+        schema,
+        use_dictionary=True,
+        dictionary_pagesize_limit=DICTIONARY_PAGE_BYTES,
+    )
+
+
+def _mark_as_sorted(
+    writer: Union[pyarrow.parquet.ParquetWriter, _IpcWriter],
+) -> None:
+    writer.add_key_value_metadata(
+        {SORTED_BY_METADATA_KEY: ",".join(key for key, _ in SORT_KEYS)}
+    )
+
+
+def _is_intermediate_dataset(filesystem_dataset: ds.Dataset) -> bool:
+    return isinstance(filesystem_dataset, ds.FileSystemDataset) and isinstance(
+        filesystem_dataset.format, (ds.ParquetFileFormat, ds.IpcFileFormat)
+    )
+
+
+def _key_value_metadata(fragment: ds.FileFragment) -> Dict[bytes, bytes]:
+    """
+    Reads the key-value metadata of a parquet file footer, or of an
+    Arrow IPC file footer and its trailing metadata batch.
+    """
+    if isinstance(fragment, ds.ParquetFileFragment):
+        return fragment.metadata.metadata or {}
+    with fragment.filesystem.open_input_file(fragment.path) as ipc_file:
+        reader = ipc.open_file(ipc_file)
+        key_value_metadata = dict(reader.metadata or {})
+        if reader.num_record_batches > 0:
+            _, batch_metadata = reader.get_batch_with_custom_metadata(
+                reader.num_record_batches - 1
+            )
+            key_value_metadata.update(batch_metadata or {})
+    return key_value_metadata
+
+
+def is_sorted_by_unit_id(filesystem_dataset: ds.Dataset) -> bool:
+    """
+    A dataset is sorted by unit_id and start_epoch_days if it is a
+    single parquet or Arrow IPC file that was marked as sorted when it
+    was written.
+    """
+    if not _is_intermediate_dataset(filesystem_dataset):
+        return False
+    fragments = list(filesystem_dataset.get_fragments())
+    if len(fragments) != 1:
+        return False
+    return (
+        _key_value_metadata(fragments[0]).get(SORTED_BY_METADATA_KEY.encode())
+        == ",".join(key for key, _ in SORT_KEYS).encode()
+    )
+
+
+def open_intermediate_dataset(
+    path: Union[str, Path], file_format: str = "parquet"
+) -> ds.FileSystemDataset:
+    """
+    Opens a parquet or Arrow IPC file, or a directory of partitions,
+    written by read_and_sanitize_csv_write_parquet. Arrow IPC files are
+    memory-mapped, so scanning them does not copy the data.
+    """
+    if file_format == "arrow":
+        return ds.dataset(
+            path, format="arrow", filesystem=fs.LocalFileSystem(use_mmap=True)
+        )
+    return ds.dataset(path, format="parquet")
+
+
+def read_dictionary_encoded(
+    filesystem_dataset: ds.Dataset, columns: List[str]
+) -> pyarrow.Table:
+    """
+    Reads the columns of a dataset into a table, with the string
+    columns of parquet files read as dictionary arrays straight from
+    the dictionary pages, without materializing a string per row.
+    Integer columns, and datasets that are not parquet files, are read
+    as they are.
+    """
+    if _is_intermediate_dataset(filesystem_dataset) and isinstance(
+        filesystem_dataset.format, ds.ParquetFileFormat
+    ):
+        filesystem_dataset = ds.dataset(
+            filesystem_dataset.files,
+            format=ds.ParquetFileFormat(
+                read_options=ds.ParquetReadOptions(dictionary_columns=columns)
+            ),
+            filesystem=filesystem_dataset.filesystem,
+        )
+    return filesystem_dataset.to_table(columns=columns)
+
+
+def _merge_sorted_runs(
+    run_paths: List[Path], batch_rows: int
+) -> Iterator[pyarrow.Table]:
+    """
+    Merges parquet runs sorted by unit_id and start_epoch_days, reading
+    every run batch_rows rows at a time. Rows with a unit_id below the
+    last buffered unit_id of every unfinished run are complete, and are
+    sorted and yielded. Runs that only buffer that unit_id are read
+    further, so all rows of an identifier are sorted together. Rows
+    without a unit_id are yielded last, in the order of the runs.
+    """
+    run_files = [parquet.ParquetFile(run_path) for run_path in run_paths]
+    batch_iterators = [
+        run_file.iter_batches(batch_size=batch_rows) for run_file in run_files
+    ]
+    buffers = [run_file.schema_arrow.empty_table() for run_file in run_files]
+    exhausted = [False] * len(run_files)
+
+    def read_next_batch(run_index: int) -> None:
+        batch = next(batch_iterators[run_index], None)
+        if batch is None:
+            exhausted[run_index] = True
+        else:
+            buffers[run_index] = pyarrow.concat_tables(
+                [buffers[run_index], pyarrow.Table.from_batches([batch])]
+            )
+
+    while True:
+        for run_index in range(len(run_files)):
+            while buffers[run_index].num_rows == 0 and not exhausted[run_index]:
+                read_next_batch(run_index)
+        last_unit_ids = {
+            run_index: buffers[run_index]["unit_id"][-1].as_py()
+            for run_index in range(len(run_files))
+            if not exhausted[run_index]
+        }
+        bounding_unit_ids = [
+            unit_id for unit_id in last_unit_ids.values() if unit_id is not None
+        ]
+        if not bounding_unit_ids:
+            break
+        bound = min(bounding_unit_ids)
+        is_complete = [
+            compute.fill_null(compute.less(buffer["unit_id"], bound), False)
+            for buffer in buffers
+        ]
+        complete_rows = pyarrow.concat_tables(
+            [
+                buffer.filter(buffer_is_complete)
+                for buffer, buffer_is_complete in zip(buffers, is_complete)
+            ]
+        )
+        if complete_rows.num_rows == 0:
+            for run_index, unit_id in last_unit_ids.items():
+                if unit_id == bound:
+                    read_next_batch(run_index)
+            continue
+        yield complete_rows.sort_by(SORT_KEYS)
+        buffers = [
+            buffer.filter(compute.invert(buffer_is_complete))
+            for buffer, buffer_is_complete in zip(buffers, is_complete)
+        ]
+
+    is_null = [compute.is_null(buffer["unit_id"]) for buffer in buffers]
+    yield pyarrow.concat_tables(
+        [
+            buffer.filter(compute.invert(buffer_is_null))
+            for buffer, buffer_is_null in zip(buffers, is_null)
+        ]
+    ).sort_by(SORT_KEYS)
+    for run_index, buffer in enumerate(buffers):
+        yield buffer.filter(is_null[run_index])
+        for batch in batch_iterators[run_index]:
+            yield pyarrow.Table.from_batches([batch])
+
+
+class _SortingWriter:
+    """
+    Sorts the sanitized tables by unit_id and start_epoch_days before
+    they are written by the row_group_writer, with at most
+    sort_run_rows rows buffered. Full buffers are sorted and written as
+    runs to the run_directory, and the runs are merged when the writer
+    is flushed. If all rows fit in a single run, they are sorted in
+    memory and no run is written.
+    """
+
+    def __init__(
+        self,
+        row_group_writer: _RowGroupWriter,
+        run_directory: Path,
+        sort_run_rows: int,
+    ) -> None:
+        self.row_group_writer = row_group_writer
+        self.run_directory = run_directory
+        self.sort_run_rows = sort_run_rows
+        self.run_paths: List[Path] = []
+        self.buffered_tables: List[pyarrow.Table] = []
+        self.buffered_rows = 0
+
+    def write_table(self, table: pyarrow.Table) -> None:
+        self.buffered_tables.append(table)
+        self.buffered_rows += table.num_rows
+        if self.buffered_rows >= self.sort_run_rows:
+            self._write_run()
+
+    def _sorted_buffer(self) -> pyarrow.Table:
+        sorted_buffer = pyarrow.concat_tables(self.buffered_tables).sort_by(
+            SORT_KEYS
+        )
+        self.buffered_tables = []
+        self.buffered_rows = 0
+        return sorted_buffer
+
+    def _write_run(self) -> None:
+        run_path = self.run_directory / f"run_{len(self.run_paths)}.parquet"
+        parquet.write_table(self._sorted_buffer(), run_path)
+        self.run_paths.append(run_path)
+
+    def flush(self) -> None:
+        if not self.run_paths:
+            if self.buffered_rows > 0:
+                self.row_group_writer.write_table(self._sorted_buffer())
+        else:
+            if self.buffered_rows > 0:
+                self._write_run()
+            for table in _merge_sorted_runs(
+                self.run_paths,
+                max(self.sort_run_rows // len(self.run_paths), 1),
+            ):
+                self.row_group_writer.write_table(table)
+        self.row_group_writer.flush()
+        _mark_as_sorted(self.row_group_writer.writer)
+
+
+def _is_ordered(table: pyarrow.Table) -> bool:
+    """
+    A table is ordered if every row has a greater unit_id than the
+    previous row, or the same unit_id and a start_epoch_days that is
+    null or not before the previous one. Rows without a unit_id are
+    not ordered.
+    """
+    current = table.slice(0, max(table.num_rows - 1, 0))
+    following = table.slice(1)
+    is_ordered = compute.or_kleene(
+        compute.less(current["unit_id"], following["unit_id"]),
+        compute.and_kleene(
+            compute.equal(current["unit_id"], following["unit_id"]),
+            compute.or_kleene(
+                compute.is_null(following["start_epoch_days"]),
+                compute.less_equal(
+                    current["start_epoch_days"], following["start_epoch_days"]
+                ),
+            ),
+        ),
+    )
+    return (
+        compute.all(compute.fill_null(is_ordered, False), min_count=0).as_py()
+        and table["unit_id"].null_count == 0
+    )
+
+
+class _SortOrderDetectingWriter:
+    """
+    Checks whether the sanitized tables are already sorted by unit_id
+    and start_epoch_days while they are written by the
+    row_group_writer, by comparing every row with the previous row.
+    If they are, the parquet file is marked as sorted when the writer
+    is flushed.
+    """
+
+    def __init__(self, row_group_writer: _RowGroupWriter) -> None:
+        self.row_group_writer = row_group_writer
+        self.is_sorted = True
+        self.previous_row: Union[pyarrow.Table, None] = None
+
+    def write_table(self, table: pyarrow.Table) -> None:
+        if self.is_sorted and table.num_rows > 0:
+            sort_columns = table.select([key for key, _ in SORT_KEYS])
+            if self.previous_row is not None:
+                sort_columns = pyarrow.concat_tables(
+                    [self.previous_row, sort_columns]
+                )
+            self.is_sorted = _is_ordered(sort_columns)
+            self.previous_row = sort_columns.slice(sort_columns.num_rows - 1)
+        self.row_group_writer.write_table(table)
+
+    def flush(self) -> None:
+        self.row_group_writer.flush()
+        if self.is_sorted:
+            _mark_as_sorted(self.row_group_writer.writer)
+
+
+def _file_writer(
+    exit_stack: ExitStack,
+    parquet_path: Path,
+    schema: pyarrow.Schema,
+    row_group_rows: int,
+    row_group_bytes: int,
+    ingestion_options: IngestionOptions,
+) -> Union[_SortOrderDetectingWriter, _SortingWriter]:
+    """
+    Opens a writer for a single parquet file on the exit_stack. Sorted
+    runs are written to a temporary directory next to the parquet file,
+    which is removed when the ingestion is done. Tables that are not
+    sorted while they are ingested are checked for being sorted already.
+    """
+    parquet_writer = exit_stack.enter_context(
+        _IpcWriter(parquet_path, schema)
+        if ingestion_options.file_format == "arrow"
+        else _parquet_writer(parquet_path, schema)
+    )
+    if ingestion_options.partition_count > 1:
+        parquet_writer.add_key_value_metadata(
+            {
+                PARTITIONED_BY_METADATA_KEY: "unit_id",
+                PARTITION_COUNT_METADATA_KEY: str(
+                    ingestion_options.partition_count
+                ),
+            }
+        )
+    row_group_writer = _RowGroupWriter(
+        parquet_writer, row_group_rows, row_group_bytes
+    )
+    if not ingestion_options.sort_by_unit_id:
+        return _SortOrderDetectingWriter(row_group_writer)
+    run_directory = exit_stack.enter_context(
+        tempfile.TemporaryDirectory(
+            prefix=f"{parquet_path.stem}_sort_runs_", dir=parquet_path.parent
+        )
+    )
+    return _SortingWriter(
+        row_group_writer,
+        Path(run_directory),
+        max(
+            ingestion_options.sort_run_rows
+            // ingestion_options.partition_count,
+            1,
+        ),
+    )
+
+
+def sort_by_unit_id(
+    filesystem_dataset: ds.Dataset,
+    columns: List[str],
+    output_parquet_path: Path,
+    sort_run_rows: int,
+) -> ds.FileSystemDataset:
+    """
+    Writes the columns of a dataset to a parquet file sorted by unit_id
+    and start_epoch_days, with an external merge sort that holds at most
+    sort_run_rows rows in memory. The sort columns are always written.
+    """
+    columns = columns + [key for key, _ in SORT_KEYS if key not in columns]
+    schema = pyarrow.schema(
+        [filesystem_dataset.schema.field(column) for column in columns]
+    )
+    row_group_rows = min(DEFAULT_ROW_GROUP_ROWS, sort_run_rows)
+    with ExitStack() as exit_stack:
+        sorting_writer = _file_writer(
+            exit_stack,
+            output_parquet_path,
+            schema,
+            row_group_rows,
+            DEFAULT_ROW_GROUP_BYTES,
+            IngestionOptions(sort_by_unit_id=True, sort_run_rows=sort_run_rows),
+        )
+        for batch in filesystem_dataset.to_batches(
+            columns=columns, batch_size=row_group_rows
+        ):
+            sorting_writer.write_table(pyarrow.Table.from_batches([batch]))
+        sorting_writer.flush()
+    return open_intermediate_dataset(output_parquet_path)
+
+
+_HASH_MULTIPLIER = numpy.uint64(0x100000001B3)
+_HASH_SEED_MULTIPLIER = numpy.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(hashes: numpy.ndarray) -> numpy.ndarray:
+    """
+    The splitmix64 finalizer, spreading similar hashes over all bits.
+    """
+    hashes = hashes ^ (hashes >> numpy.uint64(30))
+    hashes = hashes * numpy.uint64(0xBF58476D1CE4E5B9)
+    hashes = hashes ^ (hashes >> numpy.uint64(27))
+    hashes = hashes * numpy.uint64(0x94D049BB133111EB)
+    return hashes ^ (hashes >> numpy.uint64(31))
+
+
+def _hash_unit_ids(
+    unit_id: pyarrow.ChunkedArray, seed: int = 0
+) -> numpy.ndarray:
+    """
+    Hashes the unit_id column to uint64 without leaving numpy. Integer
+    identifiers are hashed from their value, and string identifiers
+    from a polynomial over their utf8 bytes, so the hash of an
+    identifier does not depend on the batch it is read in. Missing
+    identifiers hash like 0 or the empty string. A non-zero seed gives
+    a hash that is independent of the unseeded one.
+    """
+    if seed != 0:
+        with numpy.errstate(over="ignore"):
+            return _mix(
+                _hash_unit_ids(unit_id)
+                + numpy.uint64(seed) * _HASH_SEED_MULTIPLIER
+            )
+    with numpy.errstate(over="ignore"):
+        if pyarrow.types.is_integer(unit_id.type):
+            return _mix(
+                compute.fill_null(unit_id, 0)
+                .to_numpy()
+                .astype(numpy.int64)
+                .view(numpy.uint64)
+            )
+        strings = compute.fill_null(unit_id, "").combine_chunks()
+        offsets = numpy.frombuffer(strings.buffers()[1], dtype=numpy.int32)[
+            strings.offset : strings.offset + len(strings) + 1
+        ]
+        lengths = numpy.diff(offsets)
+        hashes = numpy.zeros(len(strings), dtype=numpy.uint64)
+        is_non_empty = lengths > 0
+        if is_non_empty.any():
+            values = numpy.frombuffer(strings.buffers()[2], dtype=numpy.uint8)[
+                offsets[0] : offsets[-1]
+            ]
+            positions = numpy.arange(len(values)) - numpy.repeat(
+                offsets[:-1] - offsets[0], lengths
+            )
+            powers = numpy.cumprod(
+                numpy.full(lengths.max(), _HASH_MULTIPLIER, dtype=numpy.uint64)
+            )
+            hashes[is_non_empty] = numpy.add.reduceat(
+                values.astype(numpy.uint64) * powers[positions],
+                (offsets[:-1] - offsets[0])[is_non_empty],
+            )
+        return _mix(hashes + lengths.astype(numpy.uint64))
+
+
+class _PartitionedWriter:
+    """
+    Splits the sanitized tables by a hash of unit_id over the
+    partition_writers, so all rows of an identifier are written to the
+    same partition. The rows keep their order within a partition.
+    """
+
+    def __init__(
+        self,
+        partition_writers: List[
+            Union[_SortOrderDetectingWriter, _SortingWriter, _RowGroupWriter]
+        ],
+        seed: int = 0,
+    ) -> None:
+        self.partition_writers = partition_writers
+        self.seed = seed
+
+    def write_table(self, table: pyarrow.Table) -> None:
+        partition_count = len(self.partition_writers)
+        partitions = _hash_unit_ids(table["unit_id"], self.seed) % numpy.uint64(
+            partition_count
+        )
+        partitioned_table = table.take(numpy.argsort(partitions, kind="stable"))
+        partition_offset = 0
+        for partition, partition_rows in enumerate(
+            numpy.bincount(partitions, minlength=partition_count)
+        ):
+            if partition_rows > 0:
+                self.partition_writers[partition].write_table(
+                    partitioned_table.slice(partition_offset, partition_rows)
+                )
+            partition_offset += partition_rows
+
+    def flush(self) -> None:
+        for partition_writer in self.partition_writers:
+            partition_writer.flush()
+
+
+def get_unit_id_partitions(
+    filesystem_dataset: ds.Dataset,
+) -> List[ds.Dataset]:
+    """
+    Returns the partitions of a dataset written with a partition_count,
+    one dataset per file. Any other dataset is returned as a single
+    partition.
+    """
+    if not _is_intermediate_dataset(filesystem_dataset):
+        return [filesystem_dataset]
+    fragments = list(filesystem_dataset.get_fragments())
+    for fragment in fragments:
+        key_value_metadata = _key_value_metadata(fragment)
+        if (
+            key_value_metadata.get(PARTITIONED_BY_METADATA_KEY.encode())
+            != b"unit_id"
+            or key_value_metadata.get(PARTITION_COUNT_METADATA_KEY.encode())
+            != str(len(fragments)).encode()
+        ):
+            return [filesystem_dataset]
+    return [
+        ds.dataset(
+            fragment.path,
+            format=filesystem_dataset.format,
+            filesystem=filesystem_dataset.filesystem,
+        )
+        for fragment in fragments
+    ]
+
+
+def partition_by_unit_id(
+    filesystem_dataset: ds.Dataset,
+    columns: List[str],
+    output_directory: Path,
+    partition_count: int,
+    batch_rows: int,
+    seed: int,
+) -> List[ds.FileSystemDataset]:
+    """
+    Splits the columns of a dataset over partition_count parquet files
+    in output_directory by a seeded hash of unit_id, so all rows of an
+    identifier are in the same file. The dataset is read batch_rows rows
+    at a time, and at most batch_rows rows are buffered for writing.
+    """
+    schema = pyarrow.schema(
+        [filesystem_dataset.schema.field(column) for column in columns]
+    )
+    partition_paths = [
+        output_directory / f"part-{partition:05d}.parquet"
+        for partition in range(partition_count)
+    ]
+    os.makedirs(output_directory)
+    with ExitStack() as exit_stack:
+        partitioned_writer = _PartitionedWriter(
+            [
+                _RowGroupWriter(
+                    exit_stack.enter_context(
+                        _parquet_writer(partition_path, schema)
+                    ),
+                    max(batch_rows // partition_count, 1),
+                    DEFAULT_ROW_GROUP_BYTES,
+                )
+                for partition_path in partition_paths
+            ],
+            seed,
+        )
+        for batch in filesystem_dataset.to_batches(
+            columns=columns,
+            batch_size=batch_rows,
+            batch_readahead=0,
+            fragment_readahead=0,
+        ):
+            partitioned_writer.write_table(pyarrow.Table.from_batches([batch]))
+        partitioned_writer.flush()
+    return [
+        open_intermediate_dataset(partition_path)
+        for partition_path in partition_paths
+    ]
+
+
+@contextmanager
+def _table_writer(
+    output_parquet_path: Path,
+    schema: pyarrow.Schema,
+    row_group_rows: int,
+    row_group_bytes: int,
+    ingestion_options: IngestionOptions,
+) -> Iterator[
+    Union[_SortOrderDetectingWriter, _SortingWriter, _PartitionedWriter]
+]:
+    """
+    Yields the writer for the sanitized tables. With a partition_count
+    above 1, output_parquet_path is a directory with one parquet file
+    per partition. An existing output is removed instead of overwritten,
+    as it may be a hard link to a cached copy.
+    """
+    if output_parquet_path.is_dir():
+        shutil.rmtree(output_parquet_path)
+    elif output_parquet_path.exists():
+        os.remove(output_parquet_path)
+    with ExitStack() as exit_stack:
+        if ingestion_options.partition_count == 1:
+            yield _file_writer(
+                exit_stack,
+                output_parquet_path,
+                schema,
+                row_group_rows,
+                row_group_bytes,
+                ingestion_options,
+            )
+            return
+        os.makedirs(output_parquet_path)
+        yield _PartitionedWriter(
+            [
+                _file_writer(
+                    exit_stack,
+                    output_parquet_path
+                    / f"part-{partition:05d}.{ingestion_options.file_format}",
+                    schema,
+                    row_group_rows,
+                    row_group_bytes,
+                    ingestion_options,
+                )
+                for partition in range(ingestion_options.partition_count)
+            ]
+        )
+
+
+def _file_writers(
+    writer: Union[
+        _SortOrderDetectingWriter,
+        _SortingWriter,
+        _PartitionedWriter,
+        _RowGroupWriter,
+    ],
+) -> List[Union[pyarrow.parquet.ParquetWriter, _IpcWriter]]:
+    if isinstance(writer, _PartitionedWriter):
+        return [
+            file_writer
+            for partition_writer in writer.partition_writers
+            for file_writer in _file_writers(partition_writer)
+        ]
+    if isinstance(writer, _RowGroupWriter):
+        return [writer.writer]
+    return [writer.row_group_writer.writer]
+
+
+class _IdentifierPacker:
+    """
+    Packs a unit_id column of digit strings into int64, as long as all
+    identifiers have the width of the first identifier, so that their
+    leading zeros can be restored by padding the integers to that
+    width. Integers of the same width also sort like the strings.
+    Identifiers of up to MAX_PACKED_IDENTIFIER_WIDTH digits fit in an
+    int64.
+    """
+
+    def __init__(self) -> None:
+        self.width: Union[int, None] = None
+
+    def pack(self, table: pyarrow.Table) -> Union[pyarrow.Table, None]:
+        """
+        Returns the table with a packed unit_id column, or None if any
+        identifier can not be packed.
+        """
+        unit_id = table["unit_id"]
+        identifiers = compute.drop_null(unit_id)
+        if len(identifiers) > 0:
+            min_width, max_width = (
+                compute.min_max(compute.binary_length(identifiers))
+                .as_py()
+                .values()
+            )
+            width = self.width or min_width
+            if (
+                min_width != width
+                or max_width != width
+                or width > MAX_PACKED_IDENTIFIER_WIDTH
+                or not compute.all(compute.utf8_is_digit(identifiers)).as_py()
+            ):
+                return None
+            self.width = width
+        try:
+            packed_unit_id = unit_id.cast(pyarrow.int64())
+        except ArrowInvalid:
+            # Digits outside of ASCII
+            return None
+        return table.set_column(
+            table.schema.get_field_index("unit_id"), "unit_id", packed_unit_id
+        )
+
+
+def restore_leading_zeros(
+    unit_id: Union[pyarrow.Array, pyarrow.ChunkedArray], width: int
+) -> Union[pyarrow.Array, pyarrow.ChunkedArray]:
+    """
+    Restores a unit_id column packed into int64 to the digit strings
+    of the given width.
+    """
+    return compute.utf8_lpad(
+        unit_id.cast(pyarrow.string()), width=width, padding="0"
+    )
+
+
+def get_identifier_width(
+    filesystem_dataset: ds.Dataset,
+) -> Union[int, None]:
+    """
+    Returns the width of the digit string identifiers that a dataset
+    was written with packed into int64, or None if its identifiers are
+    not packed.
+    """
+    if not _is_intermediate_dataset(filesystem_dataset):
+        return None
+    fragments = list(filesystem_dataset.get_fragments())
+    if not fragments:
+        return None
+    width = _key_value_metadata(fragments[0]).get(
+        IDENTIFIER_WIDTH_METADATA_KEY.encode()
+    )
+    return None if width is None else int(width)
+
+
 def _csv_stream_to_parquet(
     identifier_data_type: str,
     measure_data_type: str,
     temporality_type: str,
     reader: pyarrow.csv.CSVStreamingReader,
-    writer: pyarrow.parquet.ParquetWriter,
-) -> None:
+    writer: Union[
+        _SortOrderDetectingWriter, _SortingWriter, _PartitionedWriter
+    ],
+    batch_consumers: List[Callable[[pyarrow.Table], None]],
+    identifier_packer: Union[_IdentifierPacker, None] = None,
+) -> Union[pyarrow.Table, None]:
+    """
+    Writes the sanitized batches of the reader. With an
+    identifier_packer, the first table with identifiers that can not be
+    packed is returned unwritten, after it is passed to the
+    batch_consumers, and the rest of the reader is left unread.
+    """
     while True:
         try:
             batch = reader.read_next_batch()
         except StopIteration:
             break
-        table = pyarrow.Table.from_batches([batch])
-        unit_id = _sanitize_unit_id(table, identifier_data_type)
-        value = _sanitize_value(table, measure_data_type)
-        epoch_start = _cast_to_epoch_date(table, "start")
-        epoch_stop = _cast_to_epoch_date(table, "stop")
-        columns = [unit_id, value, epoch_start, epoch_stop]
-        column_names = [
-            "unit_id",
-            "value",
-            "start_epoch_days",
-            "stop_epoch_days",
-        ]
-        if temporality_type in ["STATUS", "ACCUMULATED"]:
-            columns.append(_generate_start_year(table))
-            column_names.append("start_year")
-        table = pyarrow.Table.from_arrays(columns, column_names)
+        table = _sanitize_table(
+            pyarrow.Table.from_batches([batch]),
+            identifier_data_type,
+            measure_data_type,
+            temporality_type,
+        )
+        for batch_consumer in batch_consumers:
+            batch_consumer(table)
+        if identifier_packer is not None:
+            packed_table = identifier_packer.pack(table)
+            if packed_table is None:
+                writer.flush()
+                return table
+            table = packed_table
         writer.write_table(table)
+    writer.flush()
+    return None
+
+
+def _unpack_and_continue(
+    identifier_data_type: str,
+    measure_data_type: str,
+    temporality_type: str,
+    reader: pyarrow.csv.CSVStreamingReader,
+    output_parquet_path: Path,
+    schema: pyarrow.Schema,
+    rejected_table: pyarrow.Table,
+    width: Union[int, None],
+    batch_consumers: List[Callable[[pyarrow.Table], None]],
+    row_group_rows: int,
+    row_group_bytes: int,
+    ingestion_options: IngestionOptions,
+) -> None:
+    """
+    Falls back to string identifiers when a table with identifiers that
+    can not be packed is read. The rows that were written with packed
+    identifiers are written again with their leading zeros restored,
+    followed by the rejected_table and the rest of the reader. The
+    rejected_table was already passed to the batch_consumers.
+    """
+    logger.info(
+        "Writing the identifiers as strings, as they are not all digits "
+        "of the same width"
+    )
+    packed_path = output_parquet_path.with_name(
+        f"{output_parquet_path.name}.packed"
+    )
+    os.rename(output_parquet_path, packed_path)
+    try:
+        packed_dataset = open_intermediate_dataset(
+            packed_path, ingestion_options.file_format
+        )
+        with _table_writer(
+            output_parquet_path,
+            schema,
+            row_group_rows,
+            row_group_bytes,
+            ingestion_options,
+        ) as table_writer:
+            for batch in packed_dataset.to_batches():
+                table = pyarrow.Table.from_batches([batch])
+                table_writer.write_table(
+                    table.set_column(
+                        table.schema.get_field_index("unit_id"),
+                        "unit_id",
+                        restore_leading_zeros(table["unit_id"], width or 0),
+                    )
+                )
+            table_writer.write_table(rejected_table)
+            _csv_stream_to_parquet(
+                identifier_data_type,
+                measure_data_type,
+                temporality_type,
+                reader,
+                table_writer,
+                batch_consumers,
+            )
+    finally:
+        if packed_path.is_dir():
+            shutil.rmtree(packed_path)
+        else:
+            os.remove(packed_path)
 
 
 def _csv_to_parquet(
@@ -111,48 +1091,113 @@ def _csv_to_parquet(
     identifier_data_type: str,
     measure_data_type: str,
     temporality_type: str,
+    batch_consumers: List[Callable[[pyarrow.Table], None]],
+    row_group_rows: int,
+    row_group_bytes: int,
+    ingestion_options: IngestionOptions,
 ) -> pyarrow.dataset.FileSystemDataset:
     """
     Read a csv into a pyarrow table. The read and convert options
     ensures microdata formatting of the input csv.
     """
+    file_size = os.path.getsize(input_csv_path)
+    compression = _csv_compression(input_csv_path)
+    ingestion_start = time.perf_counter()
     try:
-        with csv.open_csv(
-            input_csv_path,
-            parse_options=csv.ParseOptions(delimiter=";"),
-            read_options=_get_csv_read_options(),
-            convert_options=_get_csv_convert_options(
-                identifier_data_type, measure_data_type
-            ),
-        ) as reader:
-            schema_list = [
-                (
-                    "unit_id",
-                    _microdata_data_type_to_pyarrow(identifier_data_type),
-                ),
-                (
-                    "value",
-                    _microdata_data_type_to_disk_pyarrow(measure_data_type),
+        csv_size = _estimated_csv_size(input_csv_path)
+        ingestion_options = ingestion_options.resolve(csv_size)
+        with (
+            _pyarrow_thread_pools(ingestion_options),
+            ExitStack() as exit_stack,
+            csv.open_csv(
+                _open_csv_input(exit_stack, input_csv_path),
+                parse_options=csv.ParseOptions(delimiter=";"),
+                read_options=_get_csv_read_options(ingestion_options),
+                convert_options=_get_csv_convert_options(
+                    identifier_data_type, measure_data_type
                 ),
-                ("start_epoch_days", pyarrow.int16()),
-                ("stop_epoch_days", pyarrow.int16()),
-            ]
-            if temporality_type in ["STATUS", "ACCUMULATED"]:
-                schema_list.append(("start_year", pyarrow.string()))
-            schema = pyarrow.schema(schema_list)
-            with parquet.ParquetWriter(output_parquet_path, schema) as writer:
-                _csv_stream_to_parquet(
+            ) as reader,
+        ):
+            schema = _sanitized_schema(
+                identifier_data_type, measure_data_type, temporality_type
+            )
+            identifier_packer = (
+                _IdentifierPacker()
+                if ingestion_options.pack_digit_identifiers
+                and identifier_data_type == "STRING"
+                else None
+            )
+            rejected_table = None
+            with _table_writer(
+                Path(output_parquet_path),
+                schema
+                if identifier_packer is None
+                else schema.set(0, pyarrow.field("unit_id", pyarrow.int64())),
+                row_group_rows,
+                row_group_bytes,
+                ingestion_options,
+            ) as table_writer:
+                rejected_table = _csv_stream_to_parquet(
                     identifier_data_type,
                     measure_data_type,
                     temporality_type,
                     reader,
-                    writer,
+                    table_writer,
+                    batch_consumers,
+                    identifier_packer,
                 )
-        return pyarrow.dataset.dataset(output_parquet_path)
+                if identifier_packer is not None and rejected_table is None:
+                    for file_writer in _file_writers(table_writer):
+                        file_writer.add_key_value_metadata(
+                            {
+                                IDENTIFIER_WIDTH_METADATA_KEY: str(
+                                    identifier_packer.width or 0
+                                )
+                            }
+                        )
+            if rejected_table is not None and identifier_packer is not None:
+                _unpack_and_continue(
+                    identifier_data_type,
+                    measure_data_type,
+                    temporality_type,
+                    reader,
+                    Path(output_parquet_path),
+                    schema,
+                    rejected_table,
+                    identifier_packer.width,
+                    batch_consumers,
+                    row_group_rows,
+                    row_group_bytes,
+                    ingestion_options,
+                )
+        ingestion_seconds = time.perf_counter() - ingestion_start
+        compressed_size = (
+            ""
+            if csv_size == file_size
+            else f" (estimated from {file_size / 1_000_000:.1f} MB compressed)"
+        )
+        logger.info(
+            f"Ingested {csv_size / 1_000_000:.1f} MB of CSV{compressed_size} "
+            f"in {ingestion_seconds:.2f} s "
+            f"({csv_size / 1_000_000 / max(ingestion_seconds, 1e-9):.1f}"
+            f" MB/s) with {ingestion_options}"
+        )
+        return open_intermediate_dataset(
+            output_parquet_path, ingestion_options.file_format
+        )
     except ArrowInvalid as e:
         raise ValidationError(
             "Error when reading dataset", errors=[str(e)]
         ) from e
+    except OSError as e:
+        # A truncated or corrupt compressed csv file fails to decompress
+        # with an OSError
+        if compression is None or isinstance(e, FileNotFoundError):
+            raise
+        raise ValidationError(
+            "Error when reading dataset",
+            errors=[f"Could not decompress {compression} csv file: {e}"],
+        ) from e
 
 
 def _sanitize_unit_id(
@@ -200,17 +1245,82 @@ def _generate_start_year(table: pyarrow.Table) -> pyarrow.Array:
     )
 
 
+def _sanitized_schema(
+    identifier_data_type: str, measure_data_type: str, temporality_type: str
+) -> pyarrow.Schema:
+    schema_list = [
+        ("unit_id", _microdata_data_type_to_pyarrow(identifier_data_type)),
+        ("value", _microdata_data_type_to_disk_pyarrow(measure_data_type)),
+        ("start_epoch_days", pyarrow.int16()),
+        ("stop_epoch_days", pyarrow.int16()),
+    ]
+    if temporality_type in ["STATUS", "ACCUMULATED"]:
+        schema_list.append(("start_year", pyarrow.string()))
+    return pyarrow.schema(schema_list)
+
+
+def _sanitize_table(
+    table: pyarrow.Table,
+    identifier_data_type: str,
+    measure_data_type: str,
+    temporality_type: str,
+) -> pyarrow.Table:
+    """
+    Sanitizes a table with the unit_id, value, start and stop columns
+    of the input data to the columns of the microdata data model.
+    """
+    columns = [
+        _sanitize_unit_id(table, identifier_data_type),
+        _sanitize_value(table, measure_data_type),
+        _cast_to_epoch_date(table, "start"),
+        _cast_to_epoch_date(table, "stop"),
+    ]
+    if temporality_type in ["STATUS", "ACCUMULATED"]:
+        columns.append(_generate_start_year(table))
+    return pyarrow.Table.from_arrays(
+        columns,
+        schema=_sanitized_schema(
+            identifier_data_type, measure_data_type, temporality_type
+        ),
+    )
+
+
 def read_and_sanitize_csv_write_parquet(
     input_data_path: Path,
     output_parquet_path: Path,
     identifier_data_type: str,
     measure_data_type: str,
     temporality_type: str,
+    batch_consumers: Union[List[Callable[[pyarrow.Table], None]], None] = None,
+    row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+    row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
+    ingestion_options: Union[IngestionOptions, None] = None,
 ) -> pyarrow.dataset.FileSystemDataset:
     """
     Streams a csv file to a parquet file. Sanitizes values and
     ensures the input csv data follows the requirements for the
     microdata data model.
+    Every sanitized table is passed to the batch_consumers before it is
+    written, which lets checks that only need a single row run while the
+    data is ingested instead of reading the parquet file again.
+    Sanitized tables are coalesced into row groups of row_group_rows
+    rows, or fewer if the buffered rows reach row_group_bytes bytes.
+    The CSV block size and the pyarrow thread pools are tuned with the
+    ingestion_options, and the ingestion throughput is logged. With
+    ingestion_options.sort_by_unit_id, the parquet file is sorted by
+    unit_id and start_epoch_days with an external merge sort, and is
+    marked as sorted in the parquet footer. A csv file that is already
+    sorted is detected while it is read, and is marked as sorted too.
+    With ingestion_options.partition_count above 1, output_parquet_path
+    is a directory of parquet files partitioned by a hash of unit_id.
+    With ingestion_options.file_format "arrow", the files are written as
+    uncompressed Arrow IPC instead of parquet, and are memory-mapped when
+    they are read. A gzip, bz2 or zstd compressed csv file is
+    decompressed while it is read. With
+    ingestion_options.pack_digit_identifiers, STRING identifiers that
+    are all digits of the same width are written as int64, with the
+    width in the file footers. The identifiers are written as strings
+    from the first batch that has another identifier.
     """
     return _csv_to_parquet(
         input_data_path,
@@ -218,46 +1328,463 @@ def read_and_sanitize_csv_write_parquet(
         identifier_data_type,
         measure_data_type,
         temporality_type,
+        batch_consumers or [],
+        row_group_rows,
+        row_group_bytes,
+        ingestion_options or IngestionOptions(),
     )
 
 
-def _min_max(
+def _cast_input_column(
+    column: pyarrow.Array, pyarrow_type: pyarrow.DataType
+) -> pyarrow.Array:
+    """
+    Casts a column to the type of the csv column. Strings are converted
+    to other types like the csv reader does, ignoring surrounding
+    whitespace and reading the csv null values as null.
+    """
+    if pyarrow.types.is_string(column.type) and not pyarrow.types.is_string(
+        pyarrow_type
+    ):
+        column = compute.utf8_trim_whitespace(column)
+        column = compute.if_else(
+            compute.is_in(
+                column,
+                value_set=pyarrow.array(csv.ConvertOptions().null_values),
+            ),
+            pyarrow.scalar(None, pyarrow.string()),
+            column,
+        )
+    return column.cast(pyarrow_type)
+
+
+def _input_columns_as_csv_types(
+    batch: pyarrow.RecordBatch,
+    identifier_data_type: str,
+    measure_data_type: str,
+) -> pyarrow.Table:
+    convert_options = _get_csv_convert_options(
+        identifier_data_type, measure_data_type
+    )
+    column_names = ["unit_id", "value", "start", "stop"]
+    missing_columns = [
+        column_name
+        for column_name in column_names
+        if column_name not in batch.schema.names
+    ]
+    if missing_columns:
+        error_string = f"Missing columns in data: {missing_columns}"
+        raise ValidationError(
+            "Error when reading dataset", errors=[error_string]
+        )
+    return pyarrow.Table.from_arrays(
+        [
+            _cast_input_column(
+                batch.column(column_name),
+                convert_options.column_types[column_name],
+            )
+            for column_name in column_names
+        ],
+        column_names,
+    )
+
+
+def read_and_sanitize_table(
+    data: Union[pyarrow.Table, pyarrow.RecordBatchReader],
+    identifier_data_type: str,
+    measure_data_type: str,
+    temporality_type: str,
+    batch_consumers: Union[List[Callable[[pyarrow.Table], None]], None] = None,
+) -> pyarrow.dataset.Dataset:
+    """
+    Sanitizes a pyarrow.Table or the batches of a RecordBatchReader
+    the same way as read_and_sanitize_csv_write_parquet sanitizes the
+    rows of a csv file, and returns them as an in-memory dataset.
+    The data must have the columns unit_id, value, start and stop, which
+    are cast to the same types as the csv columns. Every sanitized table
+    is passed to the batch_consumers.
+    """
+    batches = data.to_batches() if isinstance(data, pyarrow.Table) else data
+    sanitized_tables = []
+    try:
+        for batch in batches:
+            table = _sanitize_table(
+                _input_columns_as_csv_types(
+                    batch, identifier_data_type, measure_data_type
+                ),
+                identifier_data_type,
+                measure_data_type,
+                temporality_type,
+            )
+            for batch_consumer in batch_consumers or []:
+                batch_consumer(table)
+            sanitized_tables.append(table)
+    except (ArrowInvalid, ArrowNotImplementedError) as e:
+        raise ValidationError(
+            "Error when reading dataset", errors=[str(e)]
+        ) from e
+    return ds.dataset(
+        pyarrow.concat_tables(sanitized_tables)
+        if sanitized_tables
+        else _sanitized_schema(
+            identifier_data_type, measure_data_type, temporality_type
+        ).empty_table()
+    )
+
+
+def _merge_min(
+    current: Union[int, None], other: Union[int, None]
+) -> Union[int, None]:
+    if other is None:
+        return current
+    return other if current is None else min(current, other)
+
+
+def _merge_max(
+    current: Union[int, None], other: Union[int, None]
+) -> Union[int, None]:
+    if other is None:
+        return current
+    return other if current is None else max(current, other)
+
+
+class TemporalStatistics:
+    """
+    Accumulates the minimum and maximum of the start_epoch_days and
+    stop_epoch_days columns, and the distinct status dates of a STATUS
+    dataset, one sanitized table at a time. The epoch days are stored as
+    int16, so the seen status dates fit in a bitmap of 65536 entries.
+    """
+
+    EPOCH_DAYS_OFFSET = 32768
+
+    def __init__(self, temporality_type: str) -> None:
+        self.temporality_type = temporality_type
+        self.start_min: Union[int, None] = None
+        self.start_max: Union[int, None] = None
+        self.stop_min: Union[int, None] = None
+        self.stop_max: Union[int, None] = None
+        self.status_dates_bitmap = numpy.zeros(
+            2 * self.EPOCH_DAYS_OFFSET, dtype=bool
+        )
+
+    def merge_min_max(
+        self,
+        column: str,
+        min_value: Union[int, None],
+        max_value: Union[int, None],
+    ) -> None:
+        if column == "start_epoch_days":
+            self.start_min = _merge_min(self.start_min, min_value)
+            self.start_max = _merge_max(self.start_max, max_value)
+        elif column == "stop_epoch_days":
+            self.stop_min = _merge_min(self.stop_min, min_value)
+            self.stop_max = _merge_max(self.stop_max, max_value)
+
+    def update(self, table: Union[pyarrow.Table, pyarrow.RecordBatch]) -> None:
+        for column in ["start_epoch_days", "stop_epoch_days"]:
+            if column in table.column_names:
+                self.merge_min_max(
+                    column, *compute.min_max(table[column]).as_py().values()
+                )
+        if (
+            self.temporality_type == "STATUS"
+            and "start_epoch_days" in table.column_names
+        ):
+            status_days = compute.drop_null(
+                table["start_epoch_days"]
+            ).to_numpy()
+            self.status_dates_bitmap[
+                status_days.astype(numpy.int32) + self.EPOCH_DAYS_OFFSET
+            ] = True
+
+    def status_days(self) -> List[int]:
+        return (
+            numpy.flatnonzero(self.status_dates_bitmap) - self.EPOCH_DAYS_OFFSET
+        ).tolist()
+
+    def to_dict(self) -> Dict:
+        return {
+            "temporality_type": self.temporality_type,
+            "start_min": self.start_min,
+            "start_max": self.start_max,
+            "stop_min": self.stop_min,
+            "stop_max": self.stop_max,
+            "status_days": self.status_days(),
+        }
+
+    @classmethod
+    def from_dict(cls, statistics: Dict) -> "TemporalStatistics":
+        temporal_statistics = cls(statistics["temporality_type"])
+        temporal_statistics.start_min = statistics["start_min"]
+        temporal_statistics.start_max = statistics["start_max"]
+        temporal_statistics.stop_min = statistics["stop_min"]
+        temporal_statistics.stop_max = statistics["stop_max"]
+        temporal_statistics.status_dates_bitmap[
+            numpy.array(statistics["status_days"], dtype=numpy.int32)
+            + cls.EPOCH_DAYS_OFFSET
+        ] = True
+        return temporal_statistics
+
+
+def _blocked_false_positive_rate(
+    bits_per_identifier: float, hash_count: int
+) -> float:
+    """
+    The false positive rate of a Bloom filter that sets hash_count bits
+    in a single 64-bit word per identifier. The number of identifiers
+    in a word is Poisson distributed, and a word with more identifiers
+    has more bits set than the average.
+    """
+    identifiers_per_word = 64 / bits_per_identifier
+    probability = math.exp(-identifiers_per_word)
+    false_positive_rate = 0.0
+    for identifiers in range(1, int(identifiers_per_word * 4) + 16):
+        probability *= identifiers_per_word / identifiers
+        false_positive_rate += (
+            probability
+            * (1 - (1 - 1 / 64) ** (hash_count * identifiers)) ** hash_count
+        )
+    return false_positive_rate
+
+
+def _blocked_bloom_filter_size(
+    false_positive_rate: float, max_hash_count: int
+) -> Tuple[float, int]:
+    """
+    Returns the fewest bits per identifier, and the number of bits to
+    set per identifier, that give a blocked Bloom filter at most the
+    false_positive_rate.
+    """
+    bits_per_identifier = 1.0
+    while True:
+        for hash_count in range(1, max_hash_count + 1):
+            if (
+                _blocked_false_positive_rate(bits_per_identifier, hash_count)
+                <= false_positive_rate
+            ):
+                return bits_per_identifier, hash_count
+        bits_per_identifier *= 1.1
+
+
+class UnitIdBloomFilter:
+    """
+    A scalable Bloom filter over the unit_id column, built one sanitized
+    table at a time while a dataset is ingested. Every identifier that
+    may have been seen before is kept as a candidate duplicate, so an
+    identifier that occurs more than once is always a candidate, and
+    the identifiers are unique if there are no candidates. A unique
+    identifier is a candidate with at most the false_positive_rate.
+    Every identifier sets a few bits in a single 64-bit word of the
+    filter, so it is set and tested with one memory access. Once a
+    filter holds its capacity, a filter with twice the capacity and
+    half the false positive rate is added, which keeps the overall
+    rate below the false_positive_rate. The filter stops once it has
+    MAX_CANDIDATES candidates, and is marked as overflowed.
+    """
+
+    INITIAL_CAPACITY = 1024 * 1024
+    MAX_CANDIDATES = 1024 * 1024
+    MAX_HASHES_PER_IDENTIFIER = 10
+
+    def __init__(
+        self, false_positive_rate: float, capacity: int = INITIAL_CAPACITY
+    ) -> None:
+        if not 0 < false_positive_rate < 1:
+            raise ValueError(
+                "The false positive rate must be between 0 and 1, "
+                f"got {false_positive_rate}"
+            )
+        self.false_positive_rate = false_positive_rate
+        self.capacity = capacity
+        self.filters: List[numpy.ndarray] = []
+        self.hash_counts: List[int] = []
+        self.identifier_count = 0
+        self.unit_id_type = pyarrow.string()
+        self.candidates: List[pyarrow.ChunkedArray] = []
+        self.candidate_count = 0
+        self.overflowed = False
+        self._add_filter()
+
+    def _add_filter(self) -> None:
+        level = len(self.filters)
+        capacity = self.capacity << level
+        bits_per_identifier, hash_count = _blocked_bloom_filter_size(
+            self.false_positive_rate / 2 ** (level + 1),
+            self.MAX_HASHES_PER_IDENTIFIER,
+        )
+        self.filters.append(
+            numpy.zeros(
+                max(math.ceil(capacity * bits_per_identifier / 64), 1),
+                dtype=numpy.uint64,
+            )
+        )
+        self.hash_counts.append(hash_count)
+
+    def update(self, table: pyarrow.Table) -> None:
+        if self.overflowed or table.num_rows == 0:
+            return
+        self.unit_id_type = table.schema.field("unit_id").type
+        hashes = _hash_unit_ids(table["unit_id"])
+        bit_hashes = _mix(hashes ^ _HASH_SEED_MULTIPLIER)
+        masks = [numpy.zeros(len(hashes), dtype=numpy.uint64)]
+        for bit in range(max(self.hash_counts)):
+            masks.append(
+                masks[-1]
+                | numpy.left_shift(
+                    numpy.uint64(1),
+                    (bit_hashes >> numpy.uint64(6 * bit)) & numpy.uint64(63),
+                )
+            )
+        is_candidate = numpy.zeros(len(hashes), dtype=bool)
+        for words, hash_count in zip(self.filters, self.hash_counts):
+            mask = masks[hash_count]
+            is_candidate |= (
+                words[hashes % numpy.uint64(len(words))] & mask
+            ) == mask
+        # Identifiers that are repeated within the table
+        sorted_hashes = numpy.sort(hashes)
+        repeated_hashes = sorted_hashes[1:][
+            sorted_hashes[1:] == sorted_hashes[:-1]
+        ]
+        if len(repeated_hashes) > 0:
+            is_candidate |= numpy.isin(hashes, repeated_hashes)
+        words = self.filters[-1]
+        numpy.bitwise_or.at(
+            words,
+            hashes % numpy.uint64(len(words)),
+            masks[self.hash_counts[-1]],
+        )
+        self.identifier_count += len(hashes)
+        if self.identifier_count >= self.capacity << (len(self.filters) - 1):
+            self.identifier_count = 0
+            self._add_filter()
+        if is_candidate.any():
+            self.candidates.append(table["unit_id"].filter(is_candidate))
+            self.candidate_count += int(is_candidate.sum())
+            if self.candidate_count > self.MAX_CANDIDATES:
+                self.overflowed = True
+                self.filters = []
+                self.candidates = []
+
+    def candidate_identifiers(self) -> pyarrow.Array:
+        """
+        Returns the distinct identifiers that may occur more than once.
+        """
+        return compute.unique(
+            pyarrow.chunked_array(
+                [
+                    chunk
+                    for candidates in self.candidates
+                    for chunk in candidates.chunks
+                ],
+                type=self.unit_id_type,
+            )
+        )
+
+
+def _footer_min_max(
     filesystem_dataset: ds.FileSystemDataset, column: str
-) -> tuple[int | None, int | None]:
-    min_v: int | None = None
-    max_v: int | None = None
-    for batch in filesystem_dataset.to_batches(columns=[column]):
-        maybe_min, maybe_max = compute.min_max(batch[column]).as_py().values()
-        if maybe_min is not None:
-            min_v = maybe_min if min_v is None else min(min_v, maybe_min)
-        if maybe_max is not None:
-            max_v = maybe_max if max_v is None else max(max_v, maybe_max)
+) -> Union[Tuple[Union[int, None], Union[int, None]], None]:
+    """
+    Reads the min and max of a column from the row group statistics in
+    the parquet footers, without reading any data pages. Returns None if
+    the dataset is not a parquet dataset, or if a row group containing
+    non-null values has no statistics for the column.
+    """
+    if not isinstance(
+        filesystem_dataset, ds.FileSystemDataset
+    ) or not isinstance(filesystem_dataset.format, ds.ParquetFileFormat):
+        return None
+    min_v: Union[int, None] = None
+    max_v: Union[int, None] = None
+    for fragment in filesystem_dataset.get_fragments():
+        metadata = fragment.metadata
+        if column not in metadata.schema.names:
+            return None
+        column_index = metadata.schema.names.index(column)
+        for row_group_index in range(metadata.num_row_groups):
+            row_group = metadata.row_group(row_group_index)
+            statistics = row_group.column(column_index).statistics
+            if statistics is not None and statistics.has_min_max:
+                min_v = _merge_min(min_v, statistics.min)
+                max_v = _merge_max(max_v, statistics.max)
+            elif (
+                statistics is None
+                or not statistics.has_null_count
+                or statistics.null_count != row_group.num_rows
+            ):
+                return None
     return min_v, max_v
 
 
-def _max(
-    filesystem_dataset: pyarrow.dataset.FileSystemDataset, column: str
-) -> Tuple[int | None, int | None]:
-    return _min_max(filesystem_dataset, column)[1]
+def _read_temporal_statistics(
+    filesystem_dataset: ds.FileSystemDataset, temporality_type: str
+) -> TemporalStatistics:
+    """
+    Reads the min and max of the temporal columns from the parquet
+    footer statistics where they are present, and scans the columns
+    where they are missing. The status dates of a STATUS dataset are
+    always read from the start_epoch_days column.
+    """
+    columns = (
+        ["stop_epoch_days"]
+        if temporality_type == "FIXED"
+        else ["start_epoch_days", "stop_epoch_days"]
+    )
+    temporal_statistics = TemporalStatistics(temporality_type)
+    columns_to_scan = []
+    for column in columns:
+        footer_min_max = _footer_min_max(filesystem_dataset, column)
+        if footer_min_max is None:
+            columns_to_scan.append(column)
+        else:
+            temporal_statistics.merge_min_max(column, *footer_min_max)
+    if (
+        temporality_type == "STATUS"
+        and "start_epoch_days" not in columns_to_scan
+    ):
+        columns_to_scan.append("start_epoch_days")
+    if columns_to_scan:
+        for batch in filesystem_dataset.to_batches(columns=columns_to_scan):
+            temporal_statistics.update(batch)
+    return temporal_statistics
 
 
-def _min(
-    filesystem_dataset: pyarrow.dataset.FileSystemDataset, column: str
-) -> Tuple[int | None, int | None]:
-    return _min_max(filesystem_dataset, column)[0]
+def _from_epoch_days(epoch_days: int) -> str:
+    return (datetime(1970, 1, 1) + timedelta(days=epoch_days)).strftime(
+        "%Y-%m-%d"
+    )
+
+
+def format_epoch_days(epoch_days: List[int]) -> List[str]:
+    """
+    Formats epoch days as YYYY-MM-DD in a single vectorized
+    conversion, instead of a datetime per day.
+    """
+    return numpy.array(epoch_days, dtype="datetime64[D]").astype(str).tolist()
 
 
 def get_temporal_data(
-    dataset: pyarrow.dataset.FileSystemDataset, temporality_type: str
+    dataset: pyarrow.dataset.FileSystemDataset,
+    temporality_type: str,
+    temporal_statistics: Union[TemporalStatistics, None] = None,
 ) -> Dict[str, int]:
     """
     Reads the temporal columns of the pyarrow.Table and
     returns a dictionary with information depending on the
     temporality_type of the data.
+    If temporal_statistics were accumulated while the data was
+    ingested, the dataset is not read again. Otherwise the min and max
+    are read from the parquet footer statistics when present.
     """
+    if temporal_statistics is None:
+        temporal_statistics = _read_temporal_statistics(
+            dataset, temporality_type
+        )
     temporal_data = {}
     if temporality_type == "FIXED":
-        stop_max = _max(dataset, "stop_epoch_days")
+        stop_max = temporal_statistics.stop_max
         if stop_max is None:
             error_string = (
                 "Could not read data in fourth column (Stop date)."
@@ -265,12 +1792,12 @@ def get_temporal_data(
             )
             raise ValidationError(error_string, errors=[error_string])
         temporal_data["start"] = "1900-01-01"
-        temporal_data["latest"] = (
-            datetime(1970, 1, 1) + timedelta(days=stop_max)
-        ).strftime("%Y-%m-%d")
+        temporal_data["latest"] = _from_epoch_days(stop_max)
     else:
-        start_min, start_max = _min_max(dataset, "start_epoch_days")
-        stop_min, stop_max = _min_max(dataset, "stop_epoch_days")
+        start_min = temporal_statistics.start_min
+        start_max = temporal_statistics.start_max
+        stop_min = temporal_statistics.stop_min
+        stop_max = temporal_statistics.stop_max
         if start_min is None or start_max is None:
             error_string = (
                 "Could not read data in third column (Start date)."
@@ -289,22 +1816,11 @@ def get_temporal_data(
         max_date = max(
             [date for date in [start_max, stop_max] if date is not None]
         )
-        temporal_data["start"] = (
-            datetime(1970, 1, 1) + timedelta(days=min_date)
-        ).strftime("%Y-%m-%d")
-        temporal_data["latest"] = (
-            datetime(1970, 1, 1) + timedelta(days=max_date)
-        ).strftime("%Y-%m-%d")
+        temporal_data["start"] = _from_epoch_days(min_date)
+        temporal_data["latest"] = _from_epoch_days(max_date)
 
     if temporality_type == "STATUS":
-        temporal_data["statusDates"] = [
-            (datetime(1970, 1, 1) + timedelta(days=status_days)).strftime(
-                "%Y-%m-%d"
-            )
-            for status_days in compute.unique(
-                dataset.to_table(columns=["start_epoch_days"])[
-                    "start_epoch_days"
-                ]
-            ).to_pylist()
-        ]
+        temporal_data["statusDates"] = format_epoch_days(
+            temporal_statistics.status_days()
+        )
     return temporal_data
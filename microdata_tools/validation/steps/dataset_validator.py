@@ -1,107 +1,302 @@
 # pyright: reportAttributeAccessIssue=false
-from datetime import datetime
-from typing import Iterator, List, Sequence, Union
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, repeat
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Tuple,
+    Union,
+)
 
-from pyarrow import Table, compute, dataset
+import numpy
+from pyarrow import (
+    Array,
+    ChunkedArray,
+    DataType,
+    RecordBatch,
+    Schema,
+    Table,
+    array,
+    chunked_array,
+    compute,
+    concat_arrays,
+    concat_tables,
+    dataset,
+    int32,
+    parquet,
+    types,
+)
 from pyarrow.dataset import FileSystemDataset
 
 from microdata_tools.validation.exceptions import ValidationError
+from microdata_tools.validation.steps.data_reader import (
+    SORT_KEYS,
+    TemporalStatistics,
+    UnitIdBloomFilter,
+    format_epoch_days,
+    get_identifier_width,
+    get_unit_id_partitions,
+    is_sorted_by_unit_id,
+    open_intermediate_dataset,
+    partition_by_unit_id,
+    read_dictionary_encoded,
+    restore_leading_zeros,
+    sort_by_unit_id,
+)
+
+logger = logging.getLogger()
+
+IN_MEMORY_CHECK_MEMORY_FACTOR = 4
+MAX_SPILL_PARTITIONS = 256
+MAX_SPILL_DEPTH = 3
+BINCOUNT_KEYS_PER_ROW = 2
 
 
 def _get_error_list(invalid_rows: Table, message: str) -> list[str]:
-    invalid_identifiers = (
-        invalid_rows.column("unit_id").slice(0, 50).to_pylist()
-    )
+    invalid_identifiers = invalid_rows.column("unit_id").to_pylist()
     return [
         f"{message} for row with identifier: {identifier}"
         for identifier in invalid_identifiers
     ]
 
 
-def _valid_value_column_check(
-    data: FileSystemDataset,
-    data_type: str,
-    code_list: Union[List, None],
-    sentinel_list: Union[List, None],
-) -> None:
+_ERROR_COLUMNS = ["unit_id", "value"]
+
+
+class _RowLevelCheck(NamedTuple):
+    source: str
+    # Selects the rows that fail the check, if it can be expressed as
+    # a filter
+    invalid_rows_filter: Union[dataset.Expression, None]
+    get_errors: Callable[[Table], List[str]]
+    # The date of each row, projected for invalid_rows_mask and kept as
+    # "epoch_days" in the invalid rows
+    date_column: Union[dataset.Expression, None] = None
+    # Computes the rows that fail the check from the value column and
+    # the date_column, for checks that can not be expressed as a filter
+    invalid_rows_mask: Union[Callable[[Array, Array], Array], None] = None
+
+
+def _invalid_value_filter(data_type: str) -> dataset.Expression:
     """
     Any given cell in the value column is valid only if:
     * The cell contains a a valid non-null value
     * The cell does not contain an empty string if data_type is STRING
-    * The value is present in the code_list if supplied
     """
     is_null_filter = dataset.field("value").is_null()
     is_empty_string_filter = dataset.field("value") == ""
-    invalid_rows_filter = (
+    return (
         (is_null_filter | is_empty_string_filter)
         if data_type == "STRING"
         else is_null_filter
     )
-    invalid_rows = data.to_table(
-        filter=invalid_rows_filter, columns=["unit_id"]
+
+
+def _invalid_code_filter(
+    code_list: List, sentinel_list: Union[List, None]
+) -> dataset.Expression:
+    """
+    Any given cell in the value column is valid only if the value
+    is present in the code_list or the sentinel_list.
+    """
+    unique_codes = list(
+        set(code_list_item["code"] for code_list_item in code_list)
     )
-    if len(invalid_rows) > 0:
-        raise ValidationError(
-            "#2 column",
-            errors=_get_error_list(invalid_rows, "Invalid value in #2 column"),
+    if sentinel_list:
+        unique_codes += list(
+            set(
+                sentinel_list_item["code"]
+                for sentinel_list_item in sentinel_list
+            )
         )
+    return ~dataset.field("value").isin(unique_codes)
 
-    if code_list:
-        unique_codes = list(
-            set(code_list_item["code"] for code_list_item in code_list)
+
+class _CodeValidityPeriods(NamedTuple):
+    """
+    The validity periods of the codes in a code list, as an interval
+    index sorted by the position of the code in codes and the first
+    valid day. The periods of a code do not overlap. first_periods and
+    period_counts hold the first period and number of periods of every
+    code.
+    """
+
+    codes: Array
+    period_keys: numpy.ndarray
+    period_codes: numpy.ndarray
+    valid_from: numpy.ndarray
+    valid_until: numpy.ndarray
+    first_periods: numpy.ndarray
+    period_counts: numpy.ndarray
+
+
+_NO_VALID_UNTIL = numpy.iinfo(numpy.int32).max
+
+
+def _period_keys(
+    code_indices: numpy.ndarray, epoch_days: numpy.ndarray
+) -> numpy.ndarray:
+    return (code_indices.astype(numpy.int64) << 32) | (
+        epoch_days.astype(numpy.int64) + 2**31
+    )
+
+
+def _code_validity_periods(
+    code_list: List, sentinel_list: Union[List, None]
+) -> _CodeValidityPeriods:
+    """
+    Builds the interval index of the validity periods in the code_list.
+    The codes of the sentinel_list are valid on any date, and are left
+    out of the index.
+    """
+    sentinel_codes = set(
+        sentinel_list_item["code"] for sentinel_list_item in sentinel_list or []
+    )
+    periods = [
+        code_list_item
+        for code_list_item in code_list
+        if code_list_item["code"] not in sentinel_codes
+    ]
+    codes = array(
+        list(
+            dict.fromkeys(code_list_item["code"] for code_list_item in periods)
         )
-        if sentinel_list:
-            unique_codes += list(
-                set(
-                    sentinel_list_item["code"]
-                    for sentinel_list_item in sentinel_list
-                )
+    )
+    period_codes = compute.index_in(
+        array([code_list_item["code"] for code_list_item in periods]),
+        value_set=codes,
+    ).to_numpy(zero_copy_only=False)
+    valid_from = numpy.array(
+        [code_list_item["validFrom"][:10] for code_list_item in periods],
+        dtype="datetime64[D]",
+    ).astype(numpy.int64)
+    valid_until = numpy.array(
+        [
+            (code_list_item.get("validUntil") or "NaT")[:10]
+            for code_list_item in periods
+        ],
+        dtype="datetime64[D]",
+    )
+    valid_until = numpy.where(
+        numpy.isnat(valid_until),
+        _NO_VALID_UNTIL,
+        valid_until.astype(numpy.int64),
+    )
+    period_keys = _period_keys(period_codes, valid_from)
+    order = numpy.argsort(period_keys, kind="stable")
+    period_codes = period_codes[order].astype(numpy.int64)
+    return _CodeValidityPeriods(
+        codes,
+        period_keys[order],
+        period_codes,
+        valid_from[order],
+        valid_until[order],
+        numpy.searchsorted(period_codes, numpy.arange(len(codes))),
+        numpy.bincount(period_codes, minlength=len(codes)),
+    )
+
+
+def _invalid_code_date_mask(
+    periods: _CodeValidityPeriods, values: Array, epoch_days: Array
+) -> Array:
+    """
+    Any given cell in the value column with a code from the code list
+    is valid only if the code is valid on the date in epoch_days. Every
+    row is compared with the first validity period of its code, which
+    is linear in the number of rows. Only the rows outside the first
+    period of a code with several periods are looked up in the interval
+    index with a binary search. Values that are not in the code list,
+    and rows without a date, are left to the other checks.
+    """
+    codes = periods.codes
+    if codes.type != values.type:
+        codes = codes.cast(values.type)
+    code_indices = compute.fill_null(
+        compute.index_in(values, value_set=codes), -1
+    ).to_numpy(zero_copy_only=False)
+    days = compute.fill_null(epoch_days, 0).to_numpy(zero_copy_only=False)
+    is_checked = (code_indices >= 0) & compute.is_valid(epoch_days).to_numpy(
+        zero_copy_only=False
+    )
+    first_periods = periods.first_periods[numpy.maximum(code_indices, 0)]
+    is_in_period = (periods.valid_from[first_periods] <= days) & (
+        days <= periods.valid_until[first_periods]
+    )
+    (later_period_rows,) = numpy.nonzero(
+        is_checked
+        & ~is_in_period
+        & (periods.period_counts[numpy.maximum(code_indices, 0)] > 1)
+    )
+    if len(later_period_rows) > 0:
+        later_days = days[later_period_rows]
+        period_indices = (
+            numpy.searchsorted(
+                periods.period_keys,
+                _period_keys(code_indices[later_period_rows], later_days),
+                side="right",
             )
-        invalid_code_filter = ~dataset.field("value").isin(unique_codes)
-        invalid_rows = data.to_table(
-            filter=invalid_code_filter, columns=["unit_id", "value"]
+            - 1
         )
-        if len(invalid_rows) > 0:
-            invalid_codes = (
-                invalid_rows.column("value").slice(0, 50).to_pylist()
-            )
-            invalid_unit_ids = (
-                invalid_rows.column("unit_id").slice(0, 50).to_pylist()
-            )
-            invalid_code_rows = list(zip(invalid_unit_ids, invalid_codes))
+        is_in_period[later_period_rows] = (
+            periods.period_codes[period_indices]
+            == code_indices[later_period_rows]
+        ) & (later_days <= periods.valid_until[period_indices])
+    return array(is_checked & ~is_in_period)
 
-            raise ValidationError(
-                "#2 column",
-                errors=[
-                    f"Error for identifier {unit_id}: {code} is not in "
-                    f"code list"
-                    for (unit_id, code) in invalid_code_rows
-                ],
-            )
+
+def _get_code_date_error_list(invalid_rows: Table) -> list[str]:
+    invalid_codes = invalid_rows.column("value").to_pylist()
+    invalid_unit_ids = invalid_rows.column("unit_id").to_pylist()
+    invalid_dates = format_epoch_days(
+        invalid_rows.column("epoch_days").to_pylist()
+    )
+    return [
+        f"Error for identifier {unit_id}: {code} is not in code list on {date}"
+        for (unit_id, code, date) in zip(
+            invalid_unit_ids, invalid_codes, invalid_dates
+        )
+    ]
 
 
-def _valid_unit_id_check(data: FileSystemDataset) -> None:
+def _get_code_list_error_list(invalid_rows: Table) -> list[str]:
+    invalid_codes = invalid_rows.column("value").to_pylist()
+    invalid_unit_ids = invalid_rows.column("unit_id").to_pylist()
+    return [
+        f"Error for identifier {unit_id}: {code} is not in code list"
+        for (unit_id, code) in zip(invalid_unit_ids, invalid_codes)
+    ]
+
+
+def _invalid_unit_id_filter(schema: Schema) -> dataset.Expression:
     """
     Any given cell in the unit_id column is valid only if:
     * The cell contains a a valid non-null value
     * The cell does not contain an empty string
     """
     is_null_filter = dataset.field("unit_id").is_null()
+    if not _is_string_type(schema.field("unit_id").type):
+        return is_null_filter
     is_empty_string_filter = dataset.field("unit_id") == ""
-    invalid_rows_filter = is_null_filter | is_empty_string_filter
-    invalid_rows = data.to_table(
-        filter=invalid_rows_filter, columns=["unit_id"]
-    )
-    if len(invalid_rows) > 0:
-        raise ValidationError(
-            "#1 column",
-            errors=_get_error_list(
-                invalid_rows, "Invalid identifier in #1 column"
-            ),
-        )
+    return is_null_filter | is_empty_string_filter
+
 
+def _is_string_type(data_type: DataType) -> bool:
+    if types.is_dictionary(data_type):
+        data_type = data_type.value_type
+    return types.is_string(data_type) or types.is_large_string(data_type)
 
-def _fixed_temporal_variables_check(data: FileSystemDataset) -> None:
+
+def _invalid_fixed_temporal_variables_filter() -> dataset.Expression:
     """
     Any given row in a table with temporalityType=FIXED is valid only if:
     * The start_epoch_days column contains null (empty)
@@ -109,20 +304,12 @@ def _fixed_temporal_variables_check(data: FileSystemDataset) -> None:
     """
     start_is_valid_filter = dataset.field("start_epoch_days").is_valid()
     stop_is_null_filter = dataset.field("stop_epoch_days").is_null()
-    invalid_rows = data.to_table(
-        filter=start_is_valid_filter | stop_is_null_filter,
-        columns=["unit_id"],
-    )
-    if len(invalid_rows) > 0:
-        raise ValidationError(
-            "#3 and #4 columns",
-            errors=_get_error_list(
-                invalid_rows, "Invalid #3 and/or #4 columns"
-            ),
-        )
+    return start_is_valid_filter | stop_is_null_filter
 
 
-def _status_temporal_variables_check(data: FileSystemDataset) -> None:
+def _invalid_status_temporal_variables_filters() -> Tuple[
+    dataset.Expression, dataset.Expression
+]:
     """
     Any given row in a table with temporalityType=STATUS is valid only if:
     * The start_epoch_days column contains a non-null value (int32)
@@ -130,35 +317,17 @@ def _status_temporal_variables_check(data: FileSystemDataset) -> None:
     * The start_epoch_days and stop_epoch_days columns contain the same value
       for any given row
     """
-    invalid_rows = data.to_table(
-        filter=(
-            dataset.field("stop_epoch_days").is_null()
-            | dataset.field("start_epoch_days").is_null()
-        ),
-        columns=["unit_id"],
+    is_null_filter = (
+        dataset.field("stop_epoch_days").is_null()
+        | dataset.field("start_epoch_days").is_null()
     )
-    if len(invalid_rows) > 0:
-        raise ValidationError(
-            "#3 and #4 columns",
-            errors=_get_error_list(
-                invalid_rows, "Invalid #3 and/or #4 columns"
-            ),
-        )
-    invalid_rows = data.to_table(
-        filter=dataset.field("start_epoch_days")
-        != dataset.field("stop_epoch_days"),
-        columns=["unit_id"],
-    )
-    if len(invalid_rows) > 0:
-        raise ValidationError(
-            "#3 and #4 columns",
-            errors=_get_error_list(
-                invalid_rows, "#3 column not equal to #4 column"
-            ),
-        )
+    not_equal_filter = dataset.field("start_epoch_days") != dataset.field(
+        "stop_epoch_days"
+    )
+    return is_null_filter, not_equal_filter
 
 
-def _event_temporal_variables_check(data: FileSystemDataset) -> None:
+def _invalid_event_temporal_variables_filter() -> dataset.Expression:
     """
     Any given row in a table with temporalityType=EVENT is valid only if:
     * The start_epoch_days column contains a non-null value (int32)
@@ -169,20 +338,10 @@ def _event_temporal_variables_check(data: FileSystemDataset) -> None:
     start_bt_stop_filter = dataset.field("start_epoch_days") > dataset.field(
         "stop_epoch_days"
     )  # If stop_epoch_days is null this test will be ignored by pyarrow
-    invalid_rows = data.to_table(
-        filter=(start_is_null_filter | start_bt_stop_filter),
-        columns=["unit_id"],
-    )
-    if len(invalid_rows) > 0:
-        raise ValidationError(
-            "#3 and #4 columns",
-            errors=_get_error_list(
-                invalid_rows, "Invalid #3 and/or #4 columns"
-            ),
-        )
+    return start_is_null_filter | start_bt_stop_filter
 
 
-def _accumulated_temporal_variables_check(data: FileSystemDataset) -> None:
+def _invalid_accumulated_temporal_variables_filter() -> dataset.Expression:
     """
     Any given row in a table with temporalityType=ACCUMULATED is valid only if:
     * The start_epoch_days column contains a non-null value (int32)
@@ -193,155 +352,1204 @@ def _accumulated_temporal_variables_check(data: FileSystemDataset) -> None:
     start_be_stop_filter = dataset.field("start_epoch_days") >= dataset.field(
         "stop_epoch_days"
     )
-    invalid_rows = data.to_table(
-        filter=(
-            start_is_null_filter | stop_is_null_filter | start_be_stop_filter
+    return start_is_null_filter | stop_is_null_filter | start_be_stop_filter
+
+
+def _row_level_checks(
+    schema: Schema,
+    measure_data_type: str,
+    code_list: Union[List, None],
+    sentinel_list: Union[List, None],
+    temporality_type: str,
+) -> List[_RowLevelCheck]:
+    """
+    Returns the checks that can be decided by looking at a single row,
+    in the order their errors take precedence.
+    """
+    checks = [
+        _RowLevelCheck(
+            "#1 column",
+            _invalid_unit_id_filter(schema),
+            lambda rows: _get_error_list(
+                rows, "Invalid identifier in #1 column"
+            ),
+        ),
+        _RowLevelCheck(
+            "#2 column",
+            _invalid_value_filter(measure_data_type),
+            lambda rows: _get_error_list(rows, "Invalid value in #2 column"),
         ),
-        columns=["unit_id"],
+    ]
+    if code_list:
+        checks.append(
+            _RowLevelCheck(
+                "#2 column",
+                _invalid_code_filter(code_list, sentinel_list),
+                _get_code_list_error_list,
+            )
+        )
+        periods = _code_validity_periods(code_list, sentinel_list)
+        if len(periods.codes) > 0:
+            checks.append(
+                _RowLevelCheck(
+                    "#2 column",
+                    None,
+                    _get_code_date_error_list,
+                    date_column=dataset.field(
+                        "stop_epoch_days"
+                        if temporality_type == "FIXED"
+                        else "start_epoch_days"
+                    ),
+                    invalid_rows_mask=(
+                        lambda values, epoch_days: _invalid_code_date_mask(
+                            periods, values, epoch_days
+                        )
+                    ),
+                )
+            )
+    temporal_filters = []
+    if temporality_type == "FIXED":
+        temporal_filters = [
+            (
+                "Invalid #3 and/or #4 columns",
+                _invalid_fixed_temporal_variables_filter(),
+            )
+        ]
+    elif temporality_type == "STATUS":
+        is_null_filter, not_equal_filter = (
+            _invalid_status_temporal_variables_filters()
+        )
+        temporal_filters = [
+            ("Invalid #3 and/or #4 columns", is_null_filter),
+            ("#3 column not equal to #4 column", not_equal_filter),
+        ]
+    elif temporality_type == "ACCUMULATED":
+        temporal_filters = [
+            (
+                "Invalid #3 and/or #4 columns",
+                _invalid_accumulated_temporal_variables_filter(),
+            )
+        ]
+    elif temporality_type == "EVENT":
+        temporal_filters = [
+            (
+                "Invalid #3 and/or #4 columns",
+                _invalid_event_temporal_variables_filter(),
+            )
+        ]
+    for message, invalid_filter in temporal_filters:
+        checks.append(
+            _RowLevelCheck(
+                "#3 and #4 columns",
+                invalid_filter,
+                lambda rows, message=message: _get_error_list(rows, message),
+            )
+        )
+    return checks
+
+
+class RowLevelValidator:
+    """
+    Evaluates all row level checks in a single pass over batches of
+    sanitized rows, either while they are read from the dataset or while
+    they are ingested. Each check keeps the first max_errors invalid rows
+    it encounters, and the errors of the first failing check (in order of
+    precedence) are raised. Checks with a lower precedence than a failing
+    check are no longer evaluated.
+    """
+
+    def __init__(
+        self,
+        measure_data_type: str,
+        code_list: Union[List, None],
+        sentinel_list: Union[List, None],
+        temporality_type: str,
+        max_errors: int = 50,
+    ) -> None:
+        self.measure_data_type = measure_data_type
+        self.code_list = code_list
+        self.sentinel_list = sentinel_list
+        self.temporality_type = temporality_type
+        self.max_errors = max_errors
+        self.checks: List[_RowLevelCheck] = []
+        self.projection: Dict[str, dataset.Expression] = {}
+        self.invalid_rows: List[List[RecordBatch]] = []
+        self.invalid_row_counts: List[int] = []
+        self.checks_to_evaluate = 0
+
+    def initialize_checks(self, schema: Schema) -> None:
+        """
+        Builds the checks for data with the schema, and clears the
+        invalid rows. Called before the invalid rows that workers found
+        in parts of the dataset are merged.
+        """
+        self.checks = _row_level_checks(
+            schema,
+            self.measure_data_type,
+            self.code_list,
+            self.sentinel_list,
+            self.temporality_type,
+        )
+        self.projection = {
+            column: dataset.field(column) for column in _ERROR_COLUMNS
+        }
+        for index, check in enumerate(self.checks):
+            if check.invalid_rows_filter is not None:
+                self.projection[f"invalid_{index}"] = check.invalid_rows_filter
+            if check.date_column is not None:
+                self.projection[f"date_{index}"] = check.date_column
+        self.invalid_rows = [[] for _ in self.checks]
+        self.invalid_row_counts = [0 for _ in self.checks]
+        self.checks_to_evaluate = len(self.checks)
+
+    def is_complete(self) -> bool:
+        """
+        True once the errors of the first check can no longer change,
+        which means that no further rows need to be evaluated.
+        """
+        return bool(self.checks) and (
+            self.invalid_row_counts[0] >= self.max_errors
+        )
+
+    def _evaluate_projected_batch(self, batch: RecordBatch) -> None:
+        for index in range(self.checks_to_evaluate):
+            if self.invalid_row_counts[index] >= self.max_errors:
+                continue
+            check = self.checks[index]
+            error_columns = batch.select(_ERROR_COLUMNS)
+            if check.invalid_rows_mask is None:
+                invalid_mask = compute.fill_null(
+                    batch.column(f"invalid_{index}"), False
+                )
+            else:
+                invalid_mask = check.invalid_rows_mask(
+                    batch.column("value"), batch.column(f"date_{index}")
+                )
+                error_columns = error_columns.append_column(
+                    "epoch_days", batch.column(f"date_{index}")
+                )
+            if not compute.any(invalid_mask).as_py():
+                continue
+            invalid_batch = error_columns.filter(invalid_mask).slice(
+                0, self.max_errors - self.invalid_row_counts[index]
+            )
+            self.invalid_rows[index].append(invalid_batch)
+            self.invalid_row_counts[index] += invalid_batch.num_rows
+            self.checks_to_evaluate = index + 1
+            break
+
+    def validate_batch(self, table: Table) -> None:
+        """
+        Evaluates the row level checks for a table of sanitized rows.
+        """
+        if not self.checks:
+            self.initialize_checks(table.schema)
+        if self.is_complete():
+            return
+        for batch in dataset.dataset(table).to_batches(columns=self.projection):
+            self._evaluate_projected_batch(batch)
+
+    def validate_dataset(self, data: FileSystemDataset) -> None:
+        """
+        Evaluates the row level checks in a single scan of the dataset.
+        """
+        self.initialize_checks(data.schema)
+        for batch in data.to_batches(columns=self.projection):
+            self._evaluate_projected_batch(batch)
+            if self.is_complete():
+                break
+
+    def merge_invalid_rows(self, invalid_rows: List[List[RecordBatch]]) -> None:
+        """
+        Appends the invalid rows that another RowLevelValidator found in
+        a later part of the same dataset.
+        """
+        for index, check_invalid_rows in enumerate(invalid_rows):
+            for invalid_batch in check_invalid_rows:
+                invalid_batch = invalid_batch.slice(
+                    0, self.max_errors - self.invalid_row_counts[index]
+                )
+                if invalid_batch.num_rows > 0:
+                    self.invalid_rows[index].append(invalid_batch)
+                    self.invalid_row_counts[index] += invalid_batch.num_rows
+
+    def raise_errors(self, identifier_width: Union[int, None] = None) -> None:
+        """
+        Raises the errors of the first failing check. Identifiers that
+        were packed into int64 get their leading zeros restored to the
+        identifier_width.
+        """
+        for check, check_invalid_rows in zip(self.checks, self.invalid_rows):
+            if check_invalid_rows:
+                invalid_rows = Table.from_batches(check_invalid_rows)
+                if identifier_width is not None and types.is_integer(
+                    invalid_rows.schema.field("unit_id").type
+                ):
+                    invalid_rows = invalid_rows.set_column(
+                        invalid_rows.schema.get_field_index("unit_id"),
+                        "unit_id",
+                        restore_leading_zeros(
+                            invalid_rows["unit_id"], identifier_width
+                        ),
+                    )
+                raise ValidationError(
+                    check.source, errors=check.get_errors(invalid_rows)
+                )
+
+
+def _find_duplicate_identifiers(
+    identifiers: Table, max_errors: int
+) -> List[dict]:
+    """
+    Counts the rows of every identifier with a single hash aggregation
+    and returns the first max_errors identifiers, sorted by unit_id,
+    that occur more than once.
+    """
+    identifier_counts = identifiers.group_by(
+        "unit_id", use_threads=False
+    ).aggregate([([], "count_all")])
+    return (
+        identifier_counts.filter(
+            compute.greater(identifier_counts["count_all"], 1)
+        )
+        .select(["unit_id"])
+        .sort_by([("unit_id", "ascending")])
+        .slice(0, max_errors)
+        .to_pylist()
     )
-    if len(invalid_rows) > 0:
-        raise ValidationError(
-            "#3 and #4 columns",
-            errors=_get_error_list(
-                invalid_rows, "Invalid #3 and/or #4 columns"
-            ),
+
+
+def _dense_unit_id_codes(
+    unit_id: ChunkedArray, status_day_count: int
+) -> Tuple[numpy.ndarray, Callable[[numpy.ndarray], list]]:
+    """
+    Returns int64 codes for an integer unit_id column that sort like
+    the identifiers and leave room for status_day_count status dates
+    per identifier in an int64 key, with a function that decodes the
+    codes. The identifiers are offset by their minimum when their range
+    fits, and replaced by their rank otherwise.
+    """
+    unit_id_min, unit_id_max = compute.min_max(unit_id).as_py().values()
+    if (unit_id_max - unit_id_min + 1) * status_day_count < 2**62:
+        return (
+            unit_id.to_numpy().astype(numpy.int64) - unit_id_min,
+            lambda codes: (codes + unit_id_min).tolist(),
         )
+    codes, identifiers = _unit_id_codes(unit_id)
+    return (
+        codes.to_numpy().astype(numpy.int64),
+        lambda codes: compute.take(identifiers, codes).to_pylist(),
+    )
 
 
-def _only_unique_identifiers_check(data: FileSystemDataset) -> None:
+def _find_duplicate_status_dates(
+    status_rows: Table, max_errors: int
+) -> List[dict]:
     """
-    A table with temporalityType=FIXED is only valid if all
-    cells in the unit_id column are unique.
+    Counts the rows of every (unit_id, start_epoch_days) pair and
+    returns the first max_errors pairs, sorted by unit_id and
+    start_epoch_days, that occur more than once. The distinct status
+    dates are numbered from a bitmap over the int16 epoch days, so
+    every pair gets an int64 key that sorts like the pair. Keys that
+    span at most BINCOUNT_KEYS_PER_ROW keys per row are counted with
+    numpy.bincount, and any other keys with a hash aggregation.
     """
-    identifiers = data.to_table(columns=["unit_id"])
-    identifiers = Table.from_arrays(
-        [
-            compute.utf8_slice_codeunits(
-                identifiers["unit_id"], start=0, stop=1
+    status_rows = status_rows.filter(
+        compute.and_(
+            compute.is_valid(status_rows["unit_id"]),
+            compute.is_valid(status_rows["start_epoch_days"]),
+        )
+    )
+    if status_rows.num_rows == 0:
+        return []
+    unit_id = status_rows["unit_id"]
+    if not types.is_integer(unit_id.type):
+        unit_id, identifiers = _unit_id_codes(unit_id)
+        return [
+            {
+                "unit_id": identifiers[duplicate["unit_id"]].as_py(),
+                "start_epoch_days": duplicate["start_epoch_days"],
+            }
+            for duplicate in _find_duplicate_status_dates(
+                status_rows.set_column(
+                    status_rows.schema.get_field_index("unit_id"),
+                    "unit_id",
+                    unit_id,
+                ),
+                max_errors,
+            )
+        ]
+    temporal_statistics = TemporalStatistics("STATUS")
+    temporal_statistics.update(status_rows)
+    status_days = numpy.array(temporal_statistics.status_days())
+    day_numbers = numpy.cumsum(temporal_statistics.status_dates_bitmap) - 1
+    unit_id_codes, decode_unit_ids = _dense_unit_id_codes(
+        unit_id, len(status_days)
+    )
+    keys = (
+        unit_id_codes * len(status_days)
+        + day_numbers[
+            status_rows["start_epoch_days"].to_numpy().astype(numpy.int32)
+            + TemporalStatistics.EPOCH_DAYS_OFFSET
+        ]
+    )
+    if int(keys.max()) < BINCOUNT_KEYS_PER_ROW * len(keys):
+        duplicate_keys = numpy.flatnonzero(numpy.bincount(keys) > 1)[
+            :max_errors
+        ]
+    else:
+        key_counts = (
+            Table.from_arrays([keys], names=["key"])
+            .group_by("key", use_threads=False)
+            .aggregate([([], "count_all")])
+        )
+        duplicate_keys = numpy.sort(
+            key_counts.filter(compute.greater(key_counts["count_all"], 1))[
+                "key"
+            ].to_numpy()
+        )[:max_errors]
+    return [
+        {"unit_id": duplicate_unit_id, "start_epoch_days": start_epoch_days}
+        for duplicate_unit_id, start_epoch_days in zip(
+            decode_unit_ids(duplicate_keys // len(status_days)),
+            status_days[duplicate_keys % len(status_days)].tolist(),
+        )
+    ]
+
+
+def _first_row_per_key(rows: Table, key_columns: List[str]) -> Table:
+    """
+    Keeps the first row of every run of consecutive rows with equal
+    values in the key_columns.
+    """
+    if rows.num_rows <= 1:
+        return rows
+    current = rows.slice(0, rows.num_rows - 1)
+    following = rows.slice(1)
+    is_new_key = compute.fill_null(
+        compute.not_equal(following[key_columns[0]], current[key_columns[0]]),
+        True,
+    )
+    for key_column in key_columns[1:]:
+        is_new_key = compute.or_(
+            is_new_key,
+            compute.fill_null(
+                compute.not_equal(following[key_column], current[key_column]),
+                True,
             ),
-            identifiers["unit_id"],
-        ],
-        names=["bucket", "unit_id"],
+        )
+    return rows.filter(
+        concat_arrays(
+            [
+                array([True]),
+                is_new_key.combine_chunks(),
+            ]
+        )
     )
-    unique_buckets = compute.unique(identifiers["bucket"])
-    for unique_bucket in unique_buckets:
-        bucket_table = identifiers.filter(
-            dataset.field("bucket") == unique_bucket
+
+
+def _first_duplicate_per_key(
+    key_columns: List[str],
+) -> Callable[[Table], Table]:
+    """
+    Returns a function that finds the rows of a table sorted by the
+    key_columns that are equal to the next row in all key_columns,
+    and keeps the first of them for every key.
+    """
+
+    def first_duplicate_per_key(rows: Table) -> Table:
+        current = rows.select(key_columns).slice(0, max(rows.num_rows - 1, 0))
+        following = rows.select(key_columns).slice(1)
+        is_duplicate = compute.equal(
+            current[key_columns[0]], following[key_columns[0]]
         )
-        bucket_row_count = len(bucket_table)
-        unique_identifiers_count = len(compute.unique(bucket_table["unit_id"]))
-        if unique_identifiers_count != bucket_row_count:
-            raise ValidationError(
-                "#1 column",
-                errors=["Duplicate identifiers in #1 column"],
+        for key_column in key_columns[1:]:
+            is_duplicate = compute.and_kleene(
+                is_duplicate,
+                compute.equal(current[key_column], following[key_column]),
             )
+        return _first_row_per_key(
+            current.filter(compute.fill_null(is_duplicate, False)),
+            key_columns,
+        )
+
+    return first_duplicate_per_key
 
 
-def _status_uniquesness_check(data: FileSystemDataset) -> None:
+def _first_overlap_per_identifier(time_spans: Table) -> Table:
     """
-    A table with temporalityType=STATUS is valid only if all
-    cells in the unit_id column are unique per status date.
+    Looks for overlapping timespans in a table sorted by unit_id and
+    start_epoch_days. Every row is compared with the next row, and a
+    pair overlaps if both rows belong to the same identifier and the
+    stop date of the first row is null or not before the start date of
+    the next row. Returns the first overlapping pair for every
+    identifier.
     """
-    all_status_dates = data.to_table(columns=["start_epoch_days"])
-    unique_status_dates = compute.unique(all_status_dates["start_epoch_days"])
-    for status_date in unique_status_dates:
-        status_table = data.to_table(
-            columns=["unit_id"],
-            filter=dataset.field("start_epoch_days") == status_date,
-        )
-        unique_identifiers = compute.unique(status_table["unit_id"])
-        if len(unique_identifiers) != len(status_table):
-            raise ValidationError(
-                "#1, #3 and #4 columns",
-                errors=[
-                    "Same unit_id (#1 Column) has duplicate dates "
-                    "(#3 and #4 column)"
-                ],
+    current = time_spans.slice(0, max(time_spans.num_rows - 1, 0))
+    following = time_spans.slice(1)
+    is_overlap = compute.and_kleene(
+        compute.equal(current["unit_id"], following["unit_id"]),
+        compute.or_kleene(
+            compute.is_null(current["stop_epoch_days"]),
+            compute.greater_equal(
+                current["stop_epoch_days"], following["start_epoch_days"]
+            ),
+        ),
+    )
+    overlap_indices = compute.indices_nonzero(
+        compute.fill_null(is_overlap, False)
+    )
+    return _first_row_per_key(
+        Table.from_arrays(
+            [
+                compute.take(current["unit_id"], overlap_indices),
+                compute.take(current["start_epoch_days"], overlap_indices),
+                compute.take(current["stop_epoch_days"], overlap_indices),
+                compute.take(following["start_epoch_days"], overlap_indices),
+                compute.take(following["stop_epoch_days"], overlap_indices),
+            ],
+            names=[
+                "unit_id",
+                "start_epoch_days",
+                "stop_epoch_days",
+                "next_start_epoch_days",
+                "next_stop_epoch_days",
+            ],
+        ),
+        ["unit_id"],
+    )
+
+
+def _find_in_sorted_chunks(
+    sorted_chunks: Iterable[Table],
+    find_first_per_key: Callable[[Table], Table],
+    key_columns: List[str],
+    max_errors: int,
+) -> List[dict]:
+    """
+    Runs find_first_per_key on consecutive chunks of rows sorted by
+    unit_id and start_epoch_days, and returns the first max_errors rows
+    found, at most one per key. The last row of every chunk is carried
+    over to the next chunk, so rows are compared across chunk borders,
+    and no more chunks are read once max_errors rows are found.
+    """
+    found: List[dict] = []
+    previous_row = None
+    for chunk in sorted_chunks:
+        if previous_row is not None:
+            chunk = concat_tables([previous_row, chunk])
+        if chunk.num_rows < 2:
+            # There is no pair of rows to compare yet
+            previous_row = chunk
+            continue
+        chunk_found = find_first_per_key(chunk)
+        if (
+            found
+            and chunk_found.num_rows > 0
+            and all(
+                chunk_found[key_column][0].as_py() == found[-1][key_column]
+                for key_column in key_columns
             )
+        ):
+            chunk_found = chunk_found.slice(1)
+        found += chunk_found.slice(0, max_errors - len(found)).to_pylist()
+        if len(found) >= max_errors:
+            break
+        previous_row = chunk.slice(chunk.num_rows - 1)
+    return found
 
 
-def _no_overlapping_timespans_check(data: FileSystemDataset) -> None:
+def _find_overlapping_timespans(
+    sorted_time_spans: Iterable[Table], max_errors: int
+) -> List[dict]:
     """
-    A table with temporalityType=(EVENT|ACCUMULATED) is valid
-    only if all rows for a given identifier contains no overlapping
-    timespans in the start_epoch_days and stop_epoch_days columns.
+    Finds the first overlapping timespans of the first max_errors
+    identifiers in consecutive chunks of timespans sorted by unit_id
+    and start_epoch_days.
     """
+    return _find_in_sorted_chunks(
+        sorted_time_spans,
+        _first_overlap_per_identifier,
+        ["unit_id"],
+        max_errors,
+    )
 
-    def from_epoch_days_to_date(epoch_days: Union[int, None]) -> str:
-        return (
-            ""
-            if epoch_days is None
-            else datetime.fromtimestamp(epoch_days * 24 * 60 * 60).strftime(
-                "%Y-%m-%d"
+
+def _format_timespan(
+    start_epoch_days: Union[int, None], stop_epoch_days: Union[int, None]
+) -> str:
+    start_date, stop_date = format_epoch_days(
+        [start_epoch_days, stop_epoch_days]
+    )
+    return (
+        f"({'' if start_epoch_days is None else start_date} - "
+        f"{'' if stop_epoch_days is None else stop_date})"
+    )
+
+
+def _get_overlap_error_list(overlapping_timespans: List[dict]) -> list[str]:
+    return [
+        (
+            "Invalid overlapping timespans for identifier"
+            f' "{overlap["unit_id"]}": timespan: '
+            + _format_timespan(
+                overlap["start_epoch_days"], overlap["stop_epoch_days"]
+            )
+            + " overlaps with timespan: "
+            + _format_timespan(
+                overlap["next_start_epoch_days"],
+                overlap["next_stop_epoch_days"],
             )
         )
+        for overlap in overlapping_timespans
+    ]
 
-    def find_overlap(start_list: list, stop_list: list) -> Union[str, None]:
-        """
-        Looks for overlapping timespans where each timespan
-        is defined by a start_date at an index from the start_list,
-        and a stop_date at the same index from the stop_list.
-        """
-        for i in range(len(start_list) - 1):
-            if stop_list[i] is None:
-                return (
-                    f"timespan: ({from_epoch_days_to_date(start_list[i])} - "
-                    ") overlaps with "
-                    f"timespan: "
-                    f"({from_epoch_days_to_date(start_list[i + 1])} - "
-                    f"{from_epoch_days_to_date(stop_list[i + 1])})"
-                )
-            if stop_list[i] >= start_list[i + 1]:
-                return (
-                    f"timespan: ({from_epoch_days_to_date(start_list[i])} - "
-                    f"{from_epoch_days_to_date(stop_list[i])}) "
-                    f"overlaps with timespan: "
-                    f"({from_epoch_days_to_date(start_list[i + 1])} - "
-                    f"{from_epoch_days_to_date(stop_list[i + 1])})"
+
+def _table_chunks(table: Table, chunk_size: int) -> Iterator[Table]:
+    for offset in range(0, table.num_rows, chunk_size):
+        yield table.slice(offset, chunk_size)
+
+
+def _dataset_chunks(
+    data: FileSystemDataset, columns: List[str]
+) -> Iterator[Table]:
+    for batch in data.to_batches(columns=columns):
+        yield Table.from_batches([batch])
+
+
+def _find_sorted_duplicate_identifiers(
+    sorted_identifiers: Iterable[Table], max_errors: int
+) -> List[dict]:
+    return _find_in_sorted_chunks(
+        sorted_identifiers,
+        _first_duplicate_per_key(["unit_id"]),
+        ["unit_id"],
+        max_errors,
+    )
+
+
+def _find_sorted_duplicate_status_dates(
+    sorted_status_rows: Iterable[Table], max_errors: int
+) -> List[dict]:
+    return _find_in_sorted_chunks(
+        sorted_status_rows,
+        _first_duplicate_per_key(["unit_id", "start_epoch_days"]),
+        ["unit_id", "start_epoch_days"],
+        max_errors,
+    )
+
+
+def _find_overlapping_timespans_in_table(
+    time_spans: Table, max_errors: int
+) -> List[dict]:
+    return _find_overlapping_timespans(
+        _table_chunks(
+            time_spans.sort_by(
+                [("unit_id", "ascending"), ("start_epoch_days", "ascending")]
+            ),
+            1_000_000,
+        ),
+        max_errors,
+    )
+
+
+def _get_duplicate_identifier_error_list(
+    duplicate_identifiers: List[dict],
+) -> list[str]:
+    return [
+        "Duplicate identifiers in #1 column for row with "
+        f"identifier: {duplicate['unit_id']}"
+        for duplicate in duplicate_identifiers
+    ]
+
+
+def _get_duplicate_status_date_error_list(
+    duplicate_status_dates: List[dict],
+) -> list[str]:
+    dates = format_epoch_days(
+        [duplicate["start_epoch_days"] for duplicate in duplicate_status_dates]
+    )
+    return [
+        "Same unit_id (#1 Column) has duplicate dates "
+        "(#3 and #4 column) for row with identifier: "
+        f"{duplicate['unit_id']} and date: {date}"
+        for duplicate, date in zip(duplicate_status_dates, dates)
+    ]
+
+
+class _CrossRowCheck(NamedTuple):
+    source: str
+    columns: List[str]
+    key_columns: List[str]
+    find_in_table: Callable[[Table, int], List[dict]]
+    find_in_sorted_chunks: Callable[[Iterable[Table], int], List[dict]]
+    get_errors: Callable[[List[dict]], List[str]]
+
+
+def _cross_row_check(temporality_type: str) -> Union[_CrossRowCheck, None]:
+    """
+    A table with temporalityType=FIXED is only valid if all cells in
+    the unit_id column are unique. A table with temporalityType=STATUS
+    is valid only if all cells in the unit_id column are unique per
+    status date. A table with temporalityType=(EVENT|ACCUMULATED) is
+    valid only if all rows for a given identifier contains no
+    overlapping timespans in the start_epoch_days and stop_epoch_days
+    columns.
+    """
+    if temporality_type == "FIXED":
+        return _CrossRowCheck(
+            "#1 column",
+            ["unit_id"],
+            ["unit_id"],
+            _find_duplicate_identifiers,
+            _find_sorted_duplicate_identifiers,
+            _get_duplicate_identifier_error_list,
+        )
+    elif temporality_type == "STATUS":
+        return _CrossRowCheck(
+            "#1, #3 and #4 columns",
+            ["unit_id", "start_epoch_days"],
+            ["unit_id", "start_epoch_days"],
+            _find_duplicate_status_dates,
+            _find_sorted_duplicate_status_dates,
+            _get_duplicate_status_date_error_list,
+        )
+    elif temporality_type in ["ACCUMULATED", "EVENT"]:
+        return _CrossRowCheck(
+            "#1, #3 and #4 columns",
+            ["unit_id", "start_epoch_days", "stop_epoch_days"],
+            ["unit_id"],
+            _find_overlapping_timespans_in_table,
+            _find_overlapping_timespans,
+            _get_overlap_error_list,
+        )
+    return None
+
+
+def _dictionary_key(dictionary: Array) -> Tuple[int, int, int]:
+    return (dictionary.buffers()[1].address, dictionary.offset, len(dictionary))
+
+
+def _unit_id_codes(unit_id: ChunkedArray) -> Tuple[ChunkedArray, Array]:
+    """
+    Encodes a string unit_id column as int32 codes that sort in the same
+    order as the identifiers, and returns the codes together with the
+    sorted distinct identifiers they index. A column that is read
+    dictionary-encoded shares one dictionary between all batches of a
+    row group, so only the distinct dictionaries are hashed and sorted,
+    instead of every row.
+    """
+    if not types.is_dictionary(unit_id.type):
+        unit_id = compute.dictionary_encode(unit_id)
+    dictionary_offsets: Dict[Tuple[int, int, int], int] = {}
+    dictionaries = []
+    for chunk in unit_id.chunks:
+        key = _dictionary_key(chunk.dictionary)
+        if key not in dictionary_offsets:
+            dictionary_offsets[key] = sum(map(len, dictionaries))
+            dictionaries.append(chunk.dictionary)
+    encoded = compute.dictionary_encode(
+        concat_arrays(dictionaries)
+        if dictionaries
+        else array([], type=unit_id.type.value_type)
+    )
+    order = compute.sort_indices(encoded.dictionary)
+    ranks = numpy.empty(len(encoded.dictionary), dtype=numpy.int32)
+    ranks[order.to_numpy()] = numpy.arange(len(ranks), dtype=numpy.int32)
+    dictionary_ranks = ranks[encoded.indices.to_numpy()]
+    return (
+        chunked_array(
+            [
+                compute.take(
+                    dictionary_ranks[
+                        dictionary_offsets[_dictionary_key(chunk.dictionary)] :
+                    ],
+                    chunk.indices,
                 )
-        return None
+                for chunk in unit_id.chunks
+            ],
+            type=int32(),
+        ),
+        compute.take(encoded.dictionary, order),
+    )
+
+
+def _find_in_table(
+    find_in_table: Callable[[Table, int], List[dict]],
+    table: Table,
+    max_errors: int,
+) -> List[dict]:
+    """
+    Runs find_in_table with a string unit_id column replaced by int32
+    codes, so the check sorts, groups and compares integers. Only the
+    identifiers of the findings are decoded.
+    """
+    if not _is_string_type(table.schema.field("unit_id").type):
+        return find_in_table(table, max_errors)
+    codes, identifiers = _unit_id_codes(table["unit_id"])
+    findings = find_in_table(
+        table.set_column(
+            table.schema.get_field_index("unit_id"), "unit_id", codes
+        ),
+        max_errors,
+    )
+    for finding in findings:
+        if finding["unit_id"] is not None:
+            finding["unit_id"] = identifiers[finding["unit_id"]].as_py()
+    return findings
+
+
+def _estimated_memory_bytes(data: dataset.Dataset, columns: List[str]) -> int:
+    """
+    Estimates the memory needed to check the columns of a dataset in
+    memory, from the uncompressed column sizes in the parquet metadata,
+    or from the size of Arrow IPC files. The hash tables and sort
+    indices of the checks are estimated as a multiple of the columns.
+    Data that is not in files is already in memory, and is estimated
+    as 0.
+    """
+    file_format = _file_format(data)
+    if file_format == "parquet":
+        column_bytes = 0
+        for fragment in data.get_fragments():
+            metadata = fragment.metadata
+            for row_group_index in range(metadata.num_row_groups):
+                row_group = metadata.row_group(row_group_index)
+                for column_index in range(row_group.num_columns):
+                    column = row_group.column(column_index)
+                    if column.path_in_schema in columns:
+                        column_bytes += column.total_uncompressed_size
+    elif file_format == "arrow":
+        column_bytes = sum(os.path.getsize(path) for path in data.files)
+    else:
+        return 0
+    return column_bytes * IN_MEMORY_CHECK_MEMORY_FACTOR
+
+
+def _rows_within(
+    data: FileSystemDataset, estimated_bytes: int, memory_limit: int
+) -> int:
+    return max(data.count_rows() * memory_limit // max(estimated_bytes, 1), 1)
+
+
+def _merge_partition_findings(
+    partition_findings: List[List[dict]], max_errors: int
+) -> List[dict]:
+    if len(partition_findings) == 1:
+        return partition_findings[0]
+    return sorted(
+        chain.from_iterable(partition_findings),
+        key=lambda finding: finding["unit_id"],
+    )[:max_errors]
+
+
+@contextmanager
+def _spill_directory(
+    data: FileSystemDataset, spill_directory: Union[Path, None]
+) -> Iterator[Path]:
+    """
+    Yields a temporary directory in the spill_directory, or next to the
+    data if there is no spill_directory, and removes it afterwards.
+    """
+    parent_directory = spill_directory or Path(os.path.dirname(data.files[0]))
+    os.makedirs(parent_directory, exist_ok=True)
+    with tempfile.TemporaryDirectory(
+        prefix="spill_", dir=parent_directory
+    ) as directory:
+        yield Path(directory)
+
 
-    def batch(iterable: Sequence, batch_size: int) -> Iterator:
-        for index in range(0, len(iterable), batch_size):
-            yield iterable[index : index + batch_size]
-
-    identifiers = data.to_table(columns=["unit_id"])
-    unique_identifiers = compute.unique(identifiers["unit_id"])
-    error_list = []
-    for identifier_batch in batch(unique_identifiers, 500_000):
-        identifier_time_spans = data.to_table(
-            filter=dataset.field("unit_id").isin(identifier_batch),
-            columns=["unit_id", "start_epoch_days", "stop_epoch_days"],
+def _find_spilled(
+    find_in_table: Callable[[Table, int], List[dict]],
+    find_in_sorted_chunks: Callable[[Iterable[Table], int], List[dict]],
+    columns: List[str],
+    data: FileSystemDataset,
+    max_errors: int,
+    estimated_bytes: int,
+    memory_limit: int,
+    directory: Path,
+    depth: int = 0,
+) -> List[dict]:
+    """
+    Splits the columns of the dataset by a hash of unit_id into files in
+    the directory that are estimated to fit in the memory_limit, and
+    checks them one at a time. All rows of an identifier are in the same
+    file, so the findings are merged like those of partitions. Files
+    that still do not fit, because of skewed identifiers, are split
+    again with another hash seed. After MAX_SPILL_DEPTH splits, the rows
+    are sorted with an external merge sort and streamed instead.
+    """
+    if depth == MAX_SPILL_DEPTH:
+        os.makedirs(directory, exist_ok=True)
+        sorted_data = sort_by_unit_id(
+            data,
+            columns,
+            directory / "sorted.parquet",
+            _rows_within(data, estimated_bytes, memory_limit),
         )
-        identifier_time_spans = identifier_time_spans.sort_by(
-            [("start_epoch_days", "ascending")]
+        return find_in_sorted_chunks(
+            _dataset_chunks(sorted_data, columns), max_errors
         )
-        identifier_time_spans = identifier_time_spans.group_by(
-            "unit_id", use_threads=False
-        ).aggregate([("start_epoch_days", "list"), ("stop_epoch_days", "list")])
-        for i in range(len(identifier_time_spans)):
-            overlap_message = find_overlap(
-                identifier_time_spans["start_epoch_days_list"][i].as_py(),
-                identifier_time_spans["stop_epoch_days_list"][i].as_py(),
+    partition_directory = directory / f"depth-{depth}"
+    partitions = partition_by_unit_id(
+        data,
+        # The rows are sorted by unit_id and start_epoch_days at the
+        # last depth, so the sort keys are always written
+        columns + [key for key, _ in SORT_KEYS if key not in columns],
+        partition_directory,
+        min(max(-(-estimated_bytes // memory_limit), 2), MAX_SPILL_PARTITIONS),
+        _rows_within(data, estimated_bytes, memory_limit),
+        seed=depth + 1,
+    )
+    row_count = data.count_rows()
+    partition_findings = []
+    for partition_index, partition in enumerate(partitions):
+        # Only skewed identifiers leave a partition above the limit, so
+        # it is estimated from its share of the rows
+        partition_bytes = (
+            estimated_bytes * partition.count_rows() // max(row_count, 1)
+        )
+        if partition_bytes <= memory_limit:
+            partition_findings.append(
+                _find_in_table(
+                    find_in_table,
+                    read_dictionary_encoded(partition, columns),
+                    max_errors,
+                )
             )
-            if overlap_message is not None:
-                error_list.append(
-                    (
-                        "Invalid overlapping timespans for identifier"
-                        f' "{identifier_time_spans["unit_id"][i]}":'
-                        f" {overlap_message}"
-                    )
+        else:
+            partition_findings.append(
+                _find_spilled(
+                    find_in_table,
+                    find_in_sorted_chunks,
+                    columns,
+                    partition,
+                    max_errors,
+                    partition_bytes,
+                    memory_limit,
+                    partition_directory / f"partition-{partition_index:05d}",
+                    depth=depth + 1,
                 )
-            if len(error_list) > 49:
-                raise ValidationError(
-                    "#1, #3 and #4 columns",
-                    errors=error_list,
+            )
+        # Free the disk space of every file once it is checked
+        os.remove(partition.files[0])
+    return _merge_partition_findings(partition_findings, max_errors)
+
+
+def _find_in_dataset(
+    find_in_table: Callable[[Table, int], List[dict]],
+    find_in_sorted_chunks: Callable[[Iterable[Table], int], List[dict]],
+    columns: List[str],
+    data: dataset.Dataset,
+    max_errors: int,
+    memory_limit: Union[int, None] = None,
+    spill_directory: Union[Path, None] = None,
+) -> List[dict]:
+    """
+    A dataset that is already sorted is streamed. Any other dataset is
+    read into memory, unless that is estimated to exceed the
+    memory_limit, in which case it is split into files in the
+    spill_directory that are checked one at a time.
+    """
+    if is_sorted_by_unit_id(data):
+        return find_in_sorted_chunks(_dataset_chunks(data, columns), max_errors)
+    if memory_limit is not None:
+        estimated_bytes = _estimated_memory_bytes(data, columns)
+        if estimated_bytes > memory_limit:
+            logger.info(
+                f"Checking {columns} out of core, as the estimated "
+                f"{estimated_bytes / 1_000_000:.1f} MB exceeds the memory "
+                f"limit of {memory_limit / 1_000_000:.1f} MB"
+            )
+            with _spill_directory(data, spill_directory) as directory:
+                return _find_spilled(
+                    find_in_table,
+                    find_in_sorted_chunks,
+                    columns,
+                    data,
+                    max_errors,
+                    estimated_bytes,
+                    memory_limit,
+                    directory,
                 )
-        if error_list:
-            raise ValidationError(
-                "#1, #3 and #4 columns",
-                errors=error_list,
+    return _find_in_table(
+        find_in_table, read_dictionary_encoded(data, columns), max_errors
+    )
+
+
+def _find_in_file(
+    find_in_table: Callable[[Table, int], List[dict]],
+    find_in_sorted_chunks: Callable[[Iterable[Table], int], List[dict]],
+    columns: List[str],
+    path: str,
+    file_format: str,
+    max_errors: int,
+    memory_limit: Union[int, None],
+    spill_directory: Union[Path, None],
+) -> List[dict]:
+    return _find_in_dataset(
+        find_in_table,
+        find_in_sorted_chunks,
+        columns,
+        open_intermediate_dataset(path, file_format),
+        max_errors,
+        memory_limit,
+        spill_directory,
+    )
+
+
+def _find_in_sorted_row_groups(
+    find_in_sorted_chunks: Callable[[Iterable[Table], int], List[dict]],
+    columns: List[str],
+    parquet_path: str,
+    row_groups: List[int],
+    max_errors: int,
+) -> List[dict]:
+    """
+    Runs find_in_sorted_chunks on a range of row groups of a sorted
+    parquet file. The last row of the row group before the range is
+    read first, so rows are compared across the range borders.
+    """
+    parquet_file = parquet.ParquetFile(parquet_path)
+    sorted_chunks = (
+        parquet_file.read_row_group(row_group, columns=columns)
+        for row_group in row_groups
+    )
+    if row_groups[0] > 0:
+        previous_row_group = parquet_file.read_row_group(
+            row_groups[0] - 1, columns=columns
+        )
+        sorted_chunks = chain(
+            [previous_row_group.slice(previous_row_group.num_rows - 1)],
+            sorted_chunks,
+        )
+    return find_in_sorted_chunks(sorted_chunks, max_errors)
+
+
+def _row_group_ranges(
+    row_group_count: int, range_count: int
+) -> List[List[int]]:
+    range_size = -(-row_group_count // range_count)
+    return [
+        list(range(start, min(start + range_size, row_group_count)))
+        for start in range(0, row_group_count, range_size)
+    ]
+
+
+def _merge_range_findings(
+    range_findings: Iterable[List[dict]],
+    key_columns: List[str],
+    max_errors: int,
+) -> List[dict]:
+    """
+    Concatenates the findings of consecutive row group ranges of a
+    sorted file. A key that spans a range border can be found in both
+    ranges, and only the first finding is kept.
+    """
+    merged: List[dict] = []
+    for findings in range_findings:
+        for finding in findings:
+            if merged and all(
+                finding[key_column] == merged[-1][key_column]
+                for key_column in key_columns
+            ):
+                continue
+            merged.append(finding)
+    return merged[:max_errors]
+
+
+def _find_duplicate_candidates(
+    data: dataset.Dataset,
+    unit_id_bloom_filter: UnitIdBloomFilter,
+    max_errors: int,
+) -> List[dict]:
+    """
+    Finds the duplicate identifiers among the candidates of a Bloom
+    filter that saw every identifier of the dataset. Only the rows of
+    the candidates are read. Without candidates, the identifiers are
+    unique and the dataset is not read at all.
+    """
+    candidates = unit_id_bloom_filter.candidate_identifiers()
+    logger.info(
+        f"The Bloom filter over unit_id found {len(candidates)} "
+        "candidate duplicate identifiers"
+    )
+    if len(candidates) == 0:
+        return []
+    unit_id_type = data.schema.field("unit_id").type
+    return _find_in_table(
+        _find_duplicate_identifiers,
+        data.to_table(
+            columns=["unit_id"],
+            filter=dataset.field("unit_id").isin(
+                # Identifiers packed into int64 were seen as strings
+                candidates.cast(unit_id_type)
+            ),
+        ),
+        max_errors,
+    )
+
+
+def _file_format(data: dataset.Dataset) -> Union[str, None]:
+    if not isinstance(data, FileSystemDataset):
+        return None
+    if isinstance(data.format, dataset.ParquetFileFormat):
+        return "parquet"
+    if isinstance(data.format, dataset.IpcFileFormat):
+        return "arrow"
+    return None
+
+
+def _find_cross_row_errors(
+    check: _CrossRowCheck,
+    data: dataset.Dataset,
+    max_errors: int,
+    executor: Union[ProcessPoolExecutor, None],
+    workers: int,
+    memory_limit: Union[int, None] = None,
+    spill_directory: Union[Path, None] = None,
+) -> List[dict]:
+    """
+    Runs the cross row check on every unit_id partition of the dataset.
+    All rows of an identifier are in the same partition, so the first
+    max_errors findings sorted by unit_id are the same as for the whole
+    dataset. With an executor, the partitions are checked in parallel,
+    and a single sorted parquet file is split into ranges of row groups.
+    The findings are merged in the same order as when run serially.
+    Partitions that are checked in parallel share the memory_limit, and
+    spill to the same spill_directory.
+    """
+    partitions = get_unit_id_partitions(data)
+    if executor is not None and len(partitions) > 1:
+        partition_findings = list(
+            executor.map(
+                _find_in_file,
+                repeat(check.find_in_table),
+                repeat(check.find_in_sorted_chunks),
+                repeat(check.columns),
+                [partition.files[0] for partition in partitions],
+                repeat(_file_format(data)),
+                repeat(max_errors),
+                repeat(
+                    None if memory_limit is None else memory_limit // workers
+                ),
+                repeat(spill_directory),
             )
+        )
+    elif (
+        executor is not None
+        and _file_format(data) == "parquet"
+        and is_sorted_by_unit_id(data)
+    ):
+        parquet_path = data.files[0]
+        return _merge_range_findings(
+            executor.map(
+                _find_in_sorted_row_groups,
+                repeat(check.find_in_sorted_chunks),
+                repeat(check.columns),
+                repeat(parquet_path),
+                _row_group_ranges(
+                    parquet.ParquetFile(parquet_path).num_row_groups, workers
+                ),
+                repeat(max_errors),
+            ),
+            check.key_columns,
+            max_errors,
+        )
+    else:
+        partition_findings = [
+            _find_in_dataset(
+                check.find_in_table,
+                check.find_in_sorted_chunks,
+                check.columns,
+                partition,
+                max_errors,
+                memory_limit,
+                spill_directory,
+            )
+            for partition in partitions
+        ]
+    return _merge_partition_findings(partition_findings, max_errors)
+
+
+def _validate_row_group_range(
+    parquet_path: str,
+    row_groups: List[int],
+    measure_data_type: str,
+    code_list: Union[List, None],
+    sentinel_list: Union[List, None],
+    temporality_type: str,
+    max_errors: int,
+) -> List[List[RecordBatch]]:
+    """
+    Evaluates the row level checks for a range of row groups of a
+    parquet file, and returns the invalid rows of every check.
+    """
+    parquet_dataset = dataset.dataset(parquet_path)
+    fragment = next(iter(parquet_dataset.get_fragments()))
+    row_level_validator = RowLevelValidator(
+        measure_data_type,
+        code_list,
+        sentinel_list,
+        temporality_type,
+        max_errors,
+    )
+    row_level_validator.validate_dataset(
+        FileSystemDataset(
+            [fragment.subset(row_group_ids=row_groups)],
+            parquet_dataset.schema,
+            parquet_dataset.format,
+            parquet_dataset.filesystem,
+        )
+    )
+    return row_level_validator.invalid_rows
+
+
+def _validate_rows_in_parallel(
+    row_level_validator: RowLevelValidator,
+    data: FileSystemDataset,
+    executor: ProcessPoolExecutor,
+    workers: int,
+) -> None:
+    """
+    Evaluates the row level checks of every parquet file of the dataset
+    in ranges of row groups, and merges the invalid rows in the order
+    of the files and row groups.
+    """
+    row_group_ranges = [
+        (fragment.path, row_groups)
+        for fragment in data.get_fragments()
+        for row_groups in _row_group_ranges(fragment.num_row_groups, workers)
+    ]
+    row_level_validator.initialize_checks(data.schema)
+    for invalid_rows in executor.map(
+        _validate_row_group_range,
+        [parquet_path for parquet_path, _ in row_group_ranges],
+        [row_groups for _, row_groups in row_group_ranges],
+        repeat(row_level_validator.measure_data_type),
+        repeat(row_level_validator.code_list),
+        repeat(row_level_validator.sentinel_list),
+        repeat(row_level_validator.temporality_type),
+        repeat(row_level_validator.max_errors),
+    ):
+        row_level_validator.merge_invalid_rows(invalid_rows)
+
+
+@contextmanager
+def _process_pool(workers: int) -> Iterator[Union[ProcessPoolExecutor, None]]:
+    """
+    Yields a pool of spawned worker processes, or None for a single
+    worker. Spawned workers import the __main__ module of the caller
+    again, so the caller must guard its entry point with
+    if __name__ == "__main__":.
+    """
+    if workers <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        yield executor
 
 
 def validate_dataset(
@@ -350,18 +1558,79 @@ def validate_dataset(
     code_list: Union[List, None],
     sentinel_list: Union[List, None],
     temporality_type: str,
+    max_errors: int = 50,
+    row_level_validator: Union[RowLevelValidator, None] = None,
+    workers: int = 1,
+    memory_limit: Union[int, None] = None,
+    spill_directory: Union[Path, None] = None,
+    unit_id_bloom_filter: Union[UnitIdBloomFilter, None] = None,
 ) -> None:
-    _valid_unit_id_check(data)
-    _valid_value_column_check(data, measure_data_type, code_list, sentinel_list)
-    if temporality_type == "FIXED":
-        _fixed_temporal_variables_check(data)
-        _only_unique_identifiers_check(data)
-    elif temporality_type == "STATUS":
-        _status_temporal_variables_check(data)
-        _status_uniquesness_check(data)
-    elif temporality_type == "ACCUMULATED":
-        _accumulated_temporal_variables_check(data)
-        _no_overlapping_timespans_check(data)
-    elif temporality_type == "EVENT":
-        _event_temporal_variables_check(data)
-        _no_overlapping_timespans_check(data)
+    """
+    Validates the dataset and raises a ValidationError with at most
+    max_errors errors for the first failing check. If a
+    row_level_validator is supplied, the row level checks have already
+    been evaluated on every row while the dataset was ingested, and only
+    the checks that compare rows with each other read the dataset.
+    With more than one worker, the checks run in a pool of worker
+    processes over the partitions or row groups of the files, and raise
+    the same errors as when run serially.
+    The memory_limit is passed on to the checks that compare rows with
+    each other, which spill to the spill_directory, or next to the data
+    without one.
+    Identifiers that were packed into int64 while the dataset was
+    ingested are compared as integers, and get their leading zeros
+    restored in the errors.
+    With a unit_id_bloom_filter that saw every row while the dataset was
+    ingested, the uniqueness of the identifiers of a FIXED dataset is
+    only checked for the candidate duplicates of the filter, unless
+    the filter overflowed.
+    """
+    file_format = _file_format(data)
+    with _process_pool(workers if file_format else 1) as executor:
+        if row_level_validator is None:
+            row_level_validator = RowLevelValidator(
+                measure_data_type,
+                code_list,
+                sentinel_list,
+                temporality_type,
+                max_errors,
+            )
+            if executor is None or file_format != "parquet":
+                row_level_validator.validate_dataset(data)
+            else:
+                _validate_rows_in_parallel(
+                    row_level_validator, data, executor, workers
+                )
+        identifier_width = get_identifier_width(data)
+        row_level_validator.raise_errors(identifier_width)
+        cross_row_check = _cross_row_check(temporality_type)
+        if cross_row_check is None:
+            return
+        if (
+            temporality_type == "FIXED"
+            and unit_id_bloom_filter is not None
+            and not unit_id_bloom_filter.overflowed
+        ):
+            cross_row_errors = _find_duplicate_candidates(
+                data, unit_id_bloom_filter, max_errors
+            )
+        else:
+            cross_row_errors = _find_cross_row_errors(
+                cross_row_check,
+                data,
+                max_errors,
+                executor,
+                workers,
+                memory_limit,
+                spill_directory,
+            )
+        if identifier_width is not None:
+            for cross_row_error in cross_row_errors:
+                cross_row_error["unit_id"] = (
+                    f"{cross_row_error['unit_id']:0{identifier_width}d}"
+                )
+        if cross_row_errors:
+            raise ValidationError(
+                cross_row_check.source,
+                errors=cross_row_check.get_errors(cross_row_errors),
+            )
@@ -190,8 +190,11 @@ def _insert_centralized_variable_definitions(metadata: Dict) -> None:
     ] + metadata.get("attributeVariables", [])
 
 
-def run_reader(dataset_name: str, metadata_file_path: Path) -> Dict:
-    metadata_dict = local_storage.load_json(metadata_file_path)
+def read_metadata_dict(metadata_dict: Dict) -> Dict:
+    """
+    Validates a metadata dictionary and inserts the centralized variable
+    definitions into it.
+    """
     validate_metadata_model(metadata_dict)
     _insert_centralized_variable_definitions(metadata_dict)
     code_list_errors = _validate_code_lists(metadata_dict)
@@ -199,6 +202,13 @@ def run_reader(dataset_name: str, metadata_file_path: Path) -> Dict:
         raise ValidationError(
             "Errors found in code list", errors=code_list_errors
         )
+    return metadata_dict
+
+
+def run_reader(dataset_name: str, metadata_file_path: Path) -> Dict:
+    metadata_dict = read_metadata_dict(
+        local_storage.load_json(metadata_file_path)
+    )
     metadata_dict["shortName"] = dataset_name
     metadata_dict["measureVariables"][0]["shortName"] = dataset_name
     return metadata_dict
@@ -0,0 +1,16 @@
+"""
+Test data shared by the benchmark scripts in this directory.
+"""
+
+from pathlib import Path
+
+
+def write_event_csv(csv_path: Path, row_count: int) -> None:
+    """
+    Writes a semicolon separated EVENT dataset with 20 yearly events
+    for every identifier.
+    """
+    with open(csv_path, "w", encoding="utf-8") as f:
+        for i in range(row_count):
+            year = 2000 + i % 20
+            f.write(f"{i // 20:011d};{i};{year}-01-01;{year}-12-31;\n")
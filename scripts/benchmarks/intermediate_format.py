@@ -0,0 +1,86 @@
+"""
+Benchmark of the intermediate file format in the working directory.
+
+Generates a semicolon separated EVENT dataset, ingests it once to a
+parquet file and once to an uncompressed, memory-mapped Arrow IPC file,
+and times a full scan, the temporal coverage and the dataset checks that
+read the intermediate file afterwards. The Arrow IPC file is larger on
+disk, but is scanned without decompressing or decoding.
+
+Usage:
+    uv run python scripts/benchmarks/intermediate_format.py [row_count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from benchmark_data import write_event_csv
+from pyarrow import dataset
+
+from microdata_tools.validation.model.ingestion import IngestionOptions
+from microdata_tools.validation.steps import data_reader, dataset_validator
+
+DEFAULT_ROW_COUNT = 5_000_000
+
+
+def _ingest(
+    csv_path: Path, output_path: Path, file_format: str
+) -> tuple[dataset.FileSystemDataset, float]:
+    start = time.perf_counter()
+    filesystem_dataset = data_reader.read_and_sanitize_csv_write_parquet(
+        csv_path,
+        output_path,
+        "STRING",
+        "LONG",
+        "EVENT",
+        ingestion_options=IngestionOptions(file_format=file_format),
+    )
+    return filesystem_dataset, time.perf_counter() - start
+
+
+def _time(function: Callable[..., object], *args: object) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROW_COUNT
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = Path(directory) / "BENCHMARK.csv"
+        write_event_csv(csv_path, row_count)
+        print(f"{row_count} rows, {os.path.getsize(csv_path)} bytes of CSV")
+        print(
+            f"{'format':<10}{'file bytes':>14}{'ingest s':>10}"
+            f"{'scan s':>10}{'temporal s':>12}{'checks s':>10}"
+        )
+        for file_format in ["parquet", "arrow"]:
+            output_path = Path(directory) / f"BENCHMARK.{file_format}"
+            filesystem_dataset, ingest_seconds = _ingest(
+                csv_path, output_path, file_format
+            )
+            scan_seconds = _time(filesystem_dataset.to_table)
+            temporal_seconds = _time(
+                data_reader.get_temporal_data, filesystem_dataset, "EVENT"
+            )
+            check_seconds = _time(
+                dataset_validator.validate_dataset,
+                filesystem_dataset,
+                "LONG",
+                None,
+                None,
+                "EVENT",
+            )
+            print(
+                f"{file_format:<10}{os.path.getsize(output_path):>14}"
+                f"{ingest_seconds:>10.2f}{scan_seconds:>10.2f}"
+                f"{temporal_seconds:>12.2f}{check_seconds:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
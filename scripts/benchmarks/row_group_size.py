@@ -0,0 +1,79 @@
+"""
+Benchmark of the row group coalescing in the intermediate parquet file.
+
+Generates a semicolon separated EVENT dataset, ingests it once with every
+CSV reader batch written as its own row group (the old behaviour) and once
+with the default row group size, and times a full scan and the dataset
+checks that read the parquet file afterwards.
+
+Usage:
+    uv run python scripts/benchmarks/row_group_size.py [row_count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark_data import write_event_csv
+from pyarrow import dataset, parquet
+
+from microdata_tools.validation.steps import data_reader, dataset_validator
+
+DEFAULT_ROW_COUNT = 5_000_000
+
+
+def _ingest(csv_path: Path, parquet_path: Path, row_group_bytes: int) -> float:
+    start = time.perf_counter()
+    data_reader.read_and_sanitize_csv_write_parquet(
+        csv_path,
+        parquet_path,
+        "STRING",
+        "LONG",
+        "EVENT",
+        row_group_bytes=row_group_bytes,
+    )
+    return time.perf_counter() - start
+
+
+def _time_checks(parquet_path: Path) -> tuple[float, float]:
+    filesystem_dataset = dataset.dataset(parquet_path)
+    start = time.perf_counter()
+    filesystem_dataset.to_table()
+    scan_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    dataset_validator.validate_dataset(
+        filesystem_dataset, "LONG", None, None, "EVENT"
+    )
+    return scan_seconds, time.perf_counter() - start
+
+
+def main() -> None:
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROW_COUNT
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = Path(directory) / "BENCHMARK.csv"
+        write_event_csv(csv_path, row_count)
+        print(f"{row_count} rows, {os.path.getsize(csv_path)} bytes of CSV")
+        print(
+            f"{'layout':<20}{'row groups':>12}{'parquet bytes':>16}"
+            f"{'ingest s':>10}{'scan s':>12}{'checks s':>10}"
+        )
+        for layout, row_group_bytes in [
+            ("one per CSV batch", 1),
+            ("coalesced", data_reader.DEFAULT_ROW_GROUP_BYTES),
+        ]:
+            parquet_path = Path(directory) / f"{row_group_bytes}.parquet"
+            ingest_seconds = _ingest(csv_path, parquet_path, row_group_bytes)
+            scan_seconds, check_seconds = _time_checks(parquet_path)
+            print(
+                f"{layout:<20}"
+                f"{parquet.ParquetFile(parquet_path).num_row_groups:>12}"
+                f"{os.path.getsize(parquet_path):>16}"
+                f"{ingest_seconds:>10.2f}{scan_seconds:>12.2f}"
+                f"{check_seconds:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 import os
+import shutil
 from itertools import chain
 from pathlib import Path
 from typing import Dict
 
 from pyarrow import Table, dataset, parquet
 
+from microdata_tools.validation.steps import data_reader
+
 PARQUET_DIR = Path(
     "tmp/tests/resources/validation/steps/dataset_validator/parquet"
 )
@@ -17,11 +20,57 @@ def _dataset_from_dict(name: str, table_dict: Dict):
     return dataset.dataset(parquet_path)
 
 
+def _sorted_dataset(data: dataset.FileSystemDataset):
+    """
+    Writes a copy of the dataset sorted by unit_id and start_epoch_days,
+    marked as sorted, with row groups of two rows.
+    """
+    table = data.to_table().sort_by(data_reader.SORT_KEYS)
+    parquet_path = Path(data.files[0]).with_suffix(".sorted.parquet")
+    with parquet.ParquetWriter(parquet_path, table.schema) as writer:
+        writer.write_table(table, row_group_size=2)
+        writer.add_key_value_metadata(
+            {data_reader.SORTED_BY_METADATA_KEY: "unit_id,start_epoch_days"}
+        )
+    return dataset.dataset(parquet_path)
+
+
+def _partitioned_dataset(data: dataset.FileSystemDataset, partition_count: int):
+    """
+    Writes a copy of the dataset split over partition_count parquet
+    files by a hash of unit_id, marked as partitioned.
+    """
+    table = data.to_table()
+    partitions = data_reader._hash_unit_ids(table["unit_id"]) % partition_count
+    partition_directory = Path(data.files[0]).with_suffix(".partitioned")
+    os.makedirs(partition_directory, exist_ok=True)
+    for partition in range(partition_count):
+        parquet_path = partition_directory / f"part-{partition}.parquet"
+        with parquet.ParquetWriter(parquet_path, table.schema) as writer:
+            writer.write_table(table.filter(partitions == partition))
+            writer.add_key_value_metadata(
+                {
+                    data_reader.PARTITIONED_BY_METADATA_KEY: "unit_id",
+                    data_reader.PARTITION_COUNT_METADATA_KEY: str(
+                        partition_count
+                    ),
+                }
+            )
+    return dataset.dataset(partition_directory)
+
+
 def _delete_parquet_files():
-    parquet_files = [f for f in os.listdir(PARQUET_DIR) if "parquet" in f]
+    parquet_files = [
+        f
+        for f in os.listdir(PARQUET_DIR)
+        if "parquet" in f or "partitioned" in f
+    ]
     for f in parquet_files:
         try:
-            os.remove(PARQUET_DIR / f)
+            if os.path.isdir(PARQUET_DIR / f):
+                shutil.rmtree(PARQUET_DIR / f)
+            else:
+                os.remove(PARQUET_DIR / f)
         except Exception:
             ...
 
@@ -75,6 +124,44 @@ def FIXED_STRING_CODELIST_INVALID_DS():
     )
 
 
+FIXED_STRING_CODELIST_WITH_PERIODS = [
+    {
+        "code": "1",
+        "categoryTitle": [{"languageCode": "no", "value": "Ugift"}],
+        "validFrom": "1926-01-01",
+        "validUntil": "2019-12-31",
+    },
+    {
+        "code": "1",
+        "categoryTitle": [{"languageCode": "no", "value": "Ugift"}],
+        "validFrom": "2020-06-01",
+    },
+    {
+        "code": "2",
+        "categoryTitle": [{"languageCode": "no", "value": "Gift"}],
+        "validFrom": "1926-01-01",
+    },
+    {
+        "code": "3",
+        "categoryTitle": [{"languageCode": "no", "value": "Skilt"}],
+        "validFrom": "2021-01-01",
+    },
+]
+
+
+def EVENT_STRING_CODELIST_PERIODS_DS():
+    return _dataset_from_dict(
+        "EVENT_STRING_CODELIST_PERIODS_DS",
+        {
+            "unit_id": ["1", "2", "3", "4", "5", "6"],
+            "value": ["1", "1", "3", "1", "3", "0"],
+            "start_year": ["2019", "2020", "2021", "2020", "2020", "2020"],
+            "start_epoch_days": [18000, 18500, 18700, 18300, 18600, 18300],
+            "stop_epoch_days": [None] * 6,
+        },
+    )
+
+
 # -------------------
 # MEASURE: DATA TYPE
 # -------------------
@@ -200,6 +287,34 @@ def FIXED_INVALID_DUPLICATES_DS():
     )
 
 
+def FIXED_INVALID_LONG_DUPLICATES_DS():
+    return _dataset_from_dict(
+        "FIXED_INVALID_LONG_DUPLICATES_DS",
+        {**_FIXED_VALID_DICT, "unit_id": [20, 3, 20, 3]},
+    )
+
+
+def FIXED_INVALID_TRIPLICATES_DS():
+    return _dataset_from_dict(
+        "FIXED_INVALID_TRIPLICATES_DS",
+        {**_FIXED_VALID_DICT, "unit_id": ["2", "1", "2", "2"]},
+    )
+
+
+def FIXED_INVALID_SKEWED_DUPLICATES_DS():
+    unit_ids = ["1"] * 60 + [str(i) for i in range(2, 42)] + ["7", "30"]
+    return _dataset_from_dict(
+        "FIXED_INVALID_SKEWED_DUPLICATES_DS",
+        {
+            "unit_id": unit_ids,
+            "value": ["1"] * len(unit_ids),
+            "start_year": [None] * len(unit_ids),
+            "start_epoch_days": [None] * len(unit_ids),
+            "stop_epoch_days": [18262] * len(unit_ids),
+        },
+    )
+
+
 # -------------------------
 # TEMPORALITY: STATUS
 # -------------------------
@@ -230,6 +345,19 @@ def STATUS_INVALID_DUPLICATES_DS():
     )
 
 
+def STATUS_INVALID_MULTIPLE_DUPLICATES_DS():
+    return _dataset_from_dict(
+        "STATUS_INVALID_MULTIPLE_DUPLICATES_DS",
+        {
+            "unit_id": ["2", "1", "2", "1", "2", "1"],
+            "value": ["1", "2", "3", "4", "5", "6"],
+            "start_year": ["2020", "2020", "2020", "2021", "2021", "2021"],
+            "start_epoch_days": [18626, 18626, 18626, 18991, 18991, 18626],
+            "stop_epoch_days": [18626, 18626, 18626, 18991, 18991, 18626],
+        },
+    )
+
+
 # -------------------------
 # TEMPORALITY: EVENT
 # -------------------------
@@ -282,6 +410,19 @@ def EVENT_TOO_MANY_ERRORS_DS():
     )
 
 
+def EVENT_INVALID_MULTIPLE_OVERLAPS_DS():
+    return _dataset_from_dict(
+        "EVENT_INVALID_MULTIPLE_OVERLAPS_DS",
+        {
+            "unit_id": ["2", "1", "2", "1", "1", "3"],
+            "value": ["1", "2", "3", "4", "5", "6"],
+            "start_year": ["2020"] * 6,
+            "start_epoch_days": [18680, 18671, 18626, 18626, 18660, 18626],
+            "stop_epoch_days": [None, 18680, None, 18665, 18670, 18627],
+        },
+    )
+
+
 # -------------------------
 # TEMPORALITY: ACCUMULATED
 # -------------------------
@@ -341,3 +482,24 @@ _TOO_MANY_ERRORS_DICT = {
 
 def TOO_MANY_ERRORS_DS():
     return _dataset_from_dict("TOO_MANY_ERRORS_DS", _TOO_MANY_ERRORS_DICT)
+
+
+# ----------------------
+# ERROR PRECEDENCE
+# ----------------------
+def MIXED_ERRORS_DS():
+    return _dataset_from_dict(
+        "MIXED_ERRORS_DS",
+        {
+            **_FIXED_VALID_DICT,
+            "value": ["1", "2", None, "4"],
+            "start_epoch_days": [18626, None, None, None],
+        },
+    )
+
+
+def FIXED_LONG_IDENTIFIER_DS():
+    return _dataset_from_dict(
+        "FIXED_LONG_IDENTIFIER_DS",
+        {**_FIXED_VALID_DICT, "unit_id": [1, 2, None, 4]},
+    )
@@ -0,0 +1,101 @@
+import os
+import shutil
+import time
+from pathlib import Path
+
+from microdata_tools.validation.adapter.conversion_cache import (
+    ConversionCache,
+)
+from microdata_tools.validation.model.ingestion import IngestionOptions
+
+CACHE_DIR = Path("tmp/cache")
+DATA_DIR = Path("tmp/data")
+TEMPORAL_STATISTICS = {
+    "temporality_type": "FIXED",
+    "start_min": None,
+    "start_max": None,
+    "stop_min": 18262,
+    "stop_max": 18262,
+    "status_days": [],
+}
+
+
+def _write(path: Path, content: bytes) -> Path:
+    os.makedirs(path.parent, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def _key(cache: ConversionCache, csv_path: Path, **options) -> str:
+    return cache.key(
+        csv_path, "STRING", "LONG", "FIXED", IngestionOptions(**options)
+    )
+
+
+def teardown_function():
+    shutil.rmtree("tmp", ignore_errors=True)
+
+
+def test_get_and_put():
+    cache = ConversionCache(CACHE_DIR)
+    csv_path = _write(DATA_DIR / "DATASET.csv", b"1;2;;2020-01-01;\n")
+    key = _key(cache, csv_path)
+    assert key == _key(cache, csv_path)
+    assert key != _key(cache, csv_path, file_format="arrow")
+    assert cache.get(key, DATA_DIR / "DATASET.parquet") is None
+
+    parquet_path = _write(DATA_DIR / "DATASET.parquet", b"parquet")
+    cache.put(key, parquet_path, TEMPORAL_STATISTICS)
+    os.remove(parquet_path)
+    assert cache.get(key, parquet_path) == TEMPORAL_STATISTICS
+    assert parquet_path.read_bytes() == b"parquet"
+
+    _write(csv_path, b"2;2;;2020-01-01;\n")
+    assert _key(cache, csv_path) != key
+
+
+def test_put_partitioned_data():
+    cache = ConversionCache(CACHE_DIR)
+    csv_path = _write(DATA_DIR / "DATASET.csv", b"1;2;;2020-01-01;\n")
+    key = _key(cache, csv_path, partition_count=2)
+    partitioned_path = DATA_DIR / "DATASET.parquet"
+    for partition in range(2):
+        _write(partitioned_path / f"part-{partition:05d}.parquet", b"part")
+    cache.put(key, partitioned_path, TEMPORAL_STATISTICS)
+    shutil.rmtree(partitioned_path)
+    assert cache.get(key, partitioned_path) == TEMPORAL_STATISTICS
+    assert sorted(os.listdir(partitioned_path)) == [
+        "part-00000.parquet",
+        "part-00001.parquet",
+    ]
+
+
+def test_least_recently_used_eviction():
+    cache = ConversionCache(CACHE_DIR, max_bytes=2500)
+    keys = []
+    for i in range(3):
+        csv_path = _write(DATA_DIR / f"DATASET_{i}.csv", f"{i}".encode())
+        keys.append(_key(cache, csv_path))
+        parquet_path = _write(DATA_DIR / f"DATASET_{i}.parquet", b"x" * 1000)
+        cache.put(keys[-1], parquet_path, TEMPORAL_STATISTICS)
+        # The least recently used entry is found from modification times
+        time.sleep(0.01)
+        if i == 1:
+            assert cache.get(keys[0], DATA_DIR / "DATASET_0.parquet")
+            time.sleep(0.01)
+    assert (CACHE_DIR / keys[0]).exists()
+    assert not (CACHE_DIR / keys[1]).exists()
+    assert (CACHE_DIR / keys[2]).exists()
+
+
+def test_content_hash_eviction():
+    cache = ConversionCache(CACHE_DIR, max_bytes=640)
+    for i in range(20):
+        csv_path = _write(DATA_DIR / f"DATASET_{i}.csv", f"{i}".encode())
+        _key(cache, csv_path)
+        time.sleep(0.01)
+    content_hashes_dir = CACHE_DIR / "content_hashes"
+    assert len(os.listdir(content_hashes_dir)) == 20
+    cache.evict()
+    # Each content hash takes 64 bytes
+    assert len(os.listdir(content_hashes_dir)) == 10
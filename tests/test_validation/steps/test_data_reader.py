@@ -3,9 +3,11 @@ import shutil
 from pathlib import Path
 
 import pyarrow
+import pyarrow.csv
 import pytest
 
 from microdata_tools.validation.exceptions import ValidationError
+from microdata_tools.validation.model.ingestion import IngestionOptions
 from microdata_tools.validation.steps import data_reader
 
 INPUT_DIR = Path("tests/resources/validation/steps/data_reader")
@@ -31,9 +33,13 @@ def _csv_to_table(
     ).to_table()
 
 
-def _get_temporal_data(table: pyarrow.Table, temporality_type: str):
+def _get_temporal_data(
+    table: pyarrow.Table, temporality_type: str, write_statistics: bool = True
+):
     os.makedirs("tmp", exist_ok=True)
-    pyarrow.parquet.write_table(table, "tmp/tmp.parquet")
+    pyarrow.parquet.write_table(
+        table, "tmp/tmp.parquet", write_statistics=write_statistics
+    )
     ds = pyarrow.dataset.dataset("tmp/tmp.parquet")
     return data_reader.get_temporal_data(ds, temporality_type)
 
@@ -45,7 +51,8 @@ def teardown_function():
         pass
 
 
-def test_get_temporal_data():
+@pytest.mark.parametrize("write_statistics", [True, False])
+def test_get_temporal_data(write_statistics):
     table_schema = pyarrow.schema(
         [
             pyarrow.field("start_epoch_days", pyarrow.int16()),
@@ -74,24 +81,26 @@ def test_get_temporal_data():
     }
 
     fixed_table = pyarrow.Table.from_pydict(fixed_dict, schema=table_schema)
-    assert _get_temporal_data(fixed_table, "FIXED") == {
+    assert _get_temporal_data(fixed_table, "FIXED", write_statistics) == {
         "start": "1900-01-01",
         "latest": "1970-01-06",
     }
     event_table = pyarrow.Table.from_pydict(event_dict, schema=table_schema)
-    assert _get_temporal_data(event_table, "EVENT") == {
+    assert _get_temporal_data(event_table, "EVENT", write_statistics) == {
         "start": "1970-01-02",
         "latest": "1970-01-06",
     }
     accumulated_table = pyarrow.Table.from_pydict(
         accumulated_dict, schema=table_schema
     )
-    assert _get_temporal_data(accumulated_table, "ACCUMULATED") == {
+    assert _get_temporal_data(
+        accumulated_table, "ACCUMULATED", write_statistics
+    ) == {
         "start": "1970-01-02",
         "latest": "1970-01-06",
     }
     status_table = pyarrow.Table.from_pydict(status_dict, schema=table_schema)
-    assert _get_temporal_data(status_table, "STATUS") == {
+    assert _get_temporal_data(status_table, "STATUS", write_statistics) == {
         "start": "1970-01-02",
         "latest": "1970-01-06",
         "statusDates": [
@@ -106,7 +115,7 @@ def test_get_temporal_data():
         empty_table = pyarrow.Table.from_pydict(
             empty_table, schema=table_schema
         )
-        _get_temporal_data(empty_table, "EVENT")
+        _get_temporal_data(empty_table, "EVENT", write_statistics)
     assert e.value.errors == [
         "Could not read data in third column (Start date). Is this column empty"
         "?"
@@ -222,3 +231,448 @@ def test_sanitize_data_start_year():
         "start_epoch_days": [17897, 18262, 18262],
         "stop_epoch_days": [18261, 18627, 18627],
     }
+
+
+@pytest.mark.parametrize(
+    "csv_name,measure_data_type,temporality_type",
+    [
+        ("LONG.csv", "LONG", "FIXED"),
+        ("DOUBLE.csv", "DOUBLE", "FIXED"),
+        ("DATE.csv", "DATE", "FIXED"),
+        ("STRING_STATUS.csv", "STRING", "STATUS"),
+        ("STRING_ACCUMULATED.csv", "STRING", "ACCUMULATED"),
+    ],
+)
+def test_read_and_sanitize_table(csv_name, measure_data_type, temporality_type):
+    input_table = pyarrow.csv.read_csv(
+        INPUT_DIR / csv_name,
+        parse_options=pyarrow.csv.ParseOptions(delimiter=";"),
+        read_options=pyarrow.csv.ReadOptions(
+            column_names=["unit_id", "value", "start", "stop", "attributes"]
+        ),
+        convert_options=pyarrow.csv.ConvertOptions(
+            column_types={
+                "unit_id": pyarrow.string(),
+                "value": pyarrow.string(),
+            }
+        ),
+    )
+    consumed_tables = []
+    in_memory_dataset = data_reader.read_and_sanitize_table(
+        pyarrow.RecordBatchReader.from_batches(
+            input_table.schema, input_table.to_batches(max_chunksize=2)
+        ),
+        "STRING",
+        measure_data_type,
+        temporality_type,
+        batch_consumers=[consumed_tables.append],
+    )
+    expected_table = _csv_to_table(
+        INPUT_DIR / csv_name, "STRING", measure_data_type, temporality_type
+    )
+    assert in_memory_dataset.to_table().equals(expected_table)
+    assert pyarrow.concat_tables(consumed_tables).equals(expected_table)
+
+
+def test_read_and_sanitize_table_invalid_value():
+    with pytest.raises(ValidationError) as e:
+        data_reader.read_and_sanitize_table(
+            pyarrow.table(
+                {
+                    "unit_id": ["000001"],
+                    "value": ["abc123"],
+                    "start": ["2020-01-01"],
+                    "stop": ["2020-01-01"],
+                }
+            ),
+            "STRING",
+            "LONG",
+            "FIXED",
+        )
+    assert e.value.errors == [
+        "Failed to parse string: 'abc123' as a scalar of type int64"
+    ]
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "zstd"])
+def test_compressed_csv(compression):
+    os.makedirs("tmp", exist_ok=True)
+    csv_path = INPUT_DIR / "STRING_STATUS.csv"
+    # The compression is detected from the content, not the file name
+    compressed_csv_path = Path("tmp/STRING_STATUS.csv")
+    with pyarrow.CompressedOutputStream(
+        str(compressed_csv_path), compression
+    ) as f:
+        f.write(csv_path.read_bytes())
+    # A small file is decompressed entirely to estimate its size
+    assert (
+        abs(
+            data_reader._estimated_csv_size(compressed_csv_path)
+            - csv_path.stat().st_size
+        )
+        <= 1
+    )
+    filesystem_dataset = data_reader.read_and_sanitize_csv_write_parquet(
+        compressed_csv_path,
+        Path("tmp/compressed.parquet"),
+        "STRING",
+        "STRING",
+        "STATUS",
+    )
+    assert filesystem_dataset.to_table().equals(
+        _csv_to_table(csv_path, "STRING", "STRING", "STATUS")
+    )
+
+
+def test_batch_consumers():
+    os.makedirs("tmp", exist_ok=True)
+    consumed_tables = []
+    filesystem_dataset = data_reader.read_and_sanitize_csv_write_parquet(
+        INPUT_DIR / "STRING.csv",
+        Path("tmp/tmp.parquet"),
+        "STRING",
+        "STRING",
+        "FIXED",
+        batch_consumers=[consumed_tables.append],
+    )
+    assert (
+        pyarrow.concat_tables(consumed_tables).to_pydict()
+        == filesystem_dataset.to_table().to_pydict()
+    )
+
+
+def test_temporal_statistics_from_ingestion():
+    os.makedirs("tmp", exist_ok=True)
+    temporal_statistics = data_reader.TemporalStatistics("STATUS")
+    filesystem_dataset = data_reader.read_and_sanitize_csv_write_parquet(
+        INPUT_DIR / "STRING_STATUS.csv",
+        Path("tmp/tmp.parquet"),
+        "STRING",
+        "STRING",
+        "STATUS",
+        batch_consumers=[temporal_statistics.update],
+    )
+    assert data_reader.get_temporal_data(
+        filesystem_dataset, "STATUS", temporal_statistics
+    ) == {
+        "start": "2019-01-01",
+        "latest": "2020-01-01",
+        "statusDates": ["2019-01-01", "2020-01-01"],
+    }
+    assert data_reader.get_temporal_data(
+        filesystem_dataset, "STATUS"
+    ) == data_reader.get_temporal_data(
+        filesystem_dataset, "STATUS", temporal_statistics
+    )
+
+
+def test_row_group_coalescing():
+    os.makedirs("tmp", exist_ok=True)
+    data_reader.read_and_sanitize_csv_write_parquet(
+        INPUT_DIR / "STRING.csv",
+        Path("tmp/tmp.parquet"),
+        "STRING",
+        "STRING",
+        "FIXED",
+        row_group_rows=2,
+    )
+    metadata = pyarrow.parquet.ParquetFile("tmp/tmp.parquet").metadata
+    assert [
+        metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)
+    ] == [2, 1]
+    assert pyarrow.parquet.read_table("tmp/tmp.parquet").to_pydict() == {
+        **EXPECTED_COLUMNS,
+        "value": ["abc123", "abc123", "abc123"],
+    }
+
+
+def test_ingestion_options():
+    cpu_count = pyarrow.cpu_count()
+    io_thread_count = pyarrow.io_thread_count()
+    os.makedirs("tmp", exist_ok=True)
+    table = data_reader.read_and_sanitize_csv_write_parquet(
+        INPUT_DIR / "STRING.csv",
+        Path("tmp/tmp.parquet"),
+        "STRING",
+        "STRING",
+        "FIXED",
+        ingestion_options=IngestionOptions(
+            block_size=64, use_threads=False, cpu_count=2, io_thread_count=2
+        ),
+    ).to_table()
+    assert table.to_pydict() == {
+        **EXPECTED_COLUMNS,
+        "value": ["abc123", "abc123", "abc123"],
+    }
+    assert pyarrow.cpu_count() == cpu_count
+    assert pyarrow.io_thread_count() == io_thread_count
+
+
+def test_auto_ingestion_options():
+    resolved_options = IngestionOptions(auto=True).resolve(10)
+    assert resolved_options.block_size == 1024 * 1024
+    assert resolved_options.cpu_count == os.cpu_count()
+    assert (
+        IngestionOptions(auto=True, block_size=64).resolve(10).block_size == 64
+    )
+    assert IngestionOptions().resolve(10) == IngestionOptions()
+
+
+@pytest.mark.parametrize("sort_run_rows", [1, 3, 1000])
+def test_sorted_ingestion(sort_run_rows):
+    os.makedirs("tmp", exist_ok=True)
+    unit_ids = ["3", "1", "2", "1", "3", "1", "2", "3", "1", "2"]
+    start_days = [4, 2, 1, 1, 3, 1, 5, 1, 3, 2]
+    with open("tmp/UNSORTED.csv", "w") as f:
+        for unit_id, start_day in zip(unit_ids, start_days):
+            f.write(f"{unit_id};{start_day};2020-01-0{start_day};;\n")
+    filesystem_dataset = data_reader.read_and_sanitize_csv_write_parquet(
+        Path("tmp/UNSORTED.csv"),
+        Path("tmp/tmp.parquet"),
+        "STRING",
+        "STRING",
+        "EVENT",
+        row_group_rows=4,
+        ingestion_options=IngestionOptions(
+            block_size=64, sort_by_unit_id=True, sort_run_rows=sort_run_rows
+        ),
+    )
+    table = filesystem_dataset.to_table()
+    assert table["unit_id"].to_pylist() == sorted(unit_ids)
+    assert table["value"].to_pylist() == [
+        str(start_day) for _, start_day in sorted(zip(unit_ids, start_days))
+    ]
+    assert data_reader.is_sorted_by_unit_id(filesystem_dataset)
+    assert sorted(os.listdir("tmp")) == ["UNSORTED.csv", "tmp.parquet"]
+
+
+@pytest.mark.parametrize(
+    "unit_ids, start_days, is_sorted",
+    [
+        (["1", "1", "2", "3"], [1, 2, 2, 1], True),
+        (["1", "1", "2", "3"], [1, None, None, 1], True),
+        (["1", "1", "2", "3"], [2, 1, 2, 1], False),
+        (["1", "1", "3", "2"], [1, 2, 2, 1], False),
+        (["1", "1", "2", "2"], [1, 2, None, 1], False),
+    ],
+)
+def test_sorted_csv_detection(unit_ids, start_days, is_sorted):
+    os.makedirs("tmp", exist_ok=True)
+    with open("tmp/INPUT.csv", "w") as f:
+        for unit_id, start_day in zip(unit_ids, start_days):
+            start = "" if start_day is None else f"2020-01-0{start_day}"
+            f.write(f"{unit_id};1;{start};;\n")
+    filesystem_dataset = data_reader.read_and_sanitize_csv_write_parquet(
+        Path("tmp/INPUT.csv"),
+        Path("tmp/tmp.parquet"),
+        "STRING",
+        "STRING",
+        "EVENT",
+        ingestion_options=IngestionOptions(block_size=32),
+    )
+    assert data_reader.is_sorted_by_unit_id(filesystem_dataset) == is_sorted
+
+
+@pytest.mark.parametrize("sort_by_unit_id", [False, True])
+def test_partitioned_ingestion(sort_by_unit_id):
+    os.makedirs("tmp", exist_ok=True)
+    with open("tmp/INPUT.csv", "w") as f:
+        for row in range(100):
+            f.write(f"{row % 17:05d};{row};2020-01-01;2020-01-02;\n")
+    unpartitioned_table = data_reader.read_and_sanitize_csv_write_parquet(
+        Path("tmp/INPUT.csv"),
+        Path("tmp/tmp.parquet"),
+        "STRING",
+        "STRING",
+        "EVENT",
+    ).to_table()
+    filesystem_dataset = data_reader.read_and_sanitize_csv_write_parquet(
+        Path("tmp/INPUT.csv"),
+        Path("tmp/tmp.parquet"),
+        "STRING",
+        "STRING",
+        "EVENT",
+        ingestion_options=IngestionOptions(
+            partition_count=4, sort_by_unit_id=sort_by_unit_id
+        ),
+    )
+    assert sorted(os.listdir("tmp/tmp.parquet")) == [
+        f"part-{partition:05d}.parquet" for partition in range(4)
+    ]
+    partitions = data_reader.get_unit_id_partitions(filesystem_dataset)
+    assert len(partitions) == 4
+    partition_unit_ids = [
+        set(partition.to_table()["unit_id"].to_pylist())
+        for partition in partitions
+    ]
+    assert sum(len(unit_ids) for unit_ids in partition_unit_ids) == 17
+    if sort_by_unit_id:
+        assert all(
+            data_reader.is_sorted_by_unit_id(partition)
+            for partition in partitions
+        )
+    assert filesystem_dataset.to_table().sort_by(
+        [("unit_id", "ascending"), ("value", "ascending")]
+    ) == unpartitioned_table.sort_by(
+        [("unit_id", "ascending"), ("value", "ascending")]
+    )
+
+
+@pytest.mark.parametrize(
+    "ingestion_options",
+    [
+        IngestionOptions(file_format="arrow"),
+        IngestionOptions(file_format="arrow", sort_by_unit_id=True),
+        IngestionOptions(file_format="arrow", partition_count=2),
+    ],
+)
+def test_arrow_ingestion(ingestion_options):
+    os.makedirs("tmp", exist_ok=True)
+    temporal_statistics = data_reader.TemporalStatistics("STATUS")
+    parquet_dataset = data_reader.read_and_sanitize_csv_write_parquet(
+        INPUT_DIR / "STRING_STATUS.csv",
+        Path("tmp/tmp.parquet"),
+        "STRING",
+        "STRING",
+        "STATUS",
+        batch_consumers=[temporal_statistics.update],
+    )
+    arrow_dataset = data_reader.read_and_sanitize_csv_write_parquet(
+        INPUT_DIR / "STRING_STATUS.csv",
+        Path("tmp/tmp.arrow"),
+        "STRING",
+        "STRING",
+        "STATUS",
+        ingestion_options=ingestion_options,
+    )
+    assert isinstance(arrow_dataset.format, pyarrow.dataset.IpcFileFormat)
+    for arrow_file in arrow_dataset.files:
+        with open(arrow_file, "rb") as f:
+            assert f.read(6) == b"ARROW1"
+    assert arrow_dataset.to_table().sort_by(
+        data_reader.SORT_KEYS
+    ) == parquet_dataset.to_table().sort_by(data_reader.SORT_KEYS)
+    assert data_reader.get_temporal_data(
+        arrow_dataset, "STATUS"
+    ) == data_reader.get_temporal_data(
+        parquet_dataset, "STATUS", temporal_statistics
+    )
+    assert len(data_reader.get_unit_id_partitions(arrow_dataset)) == (
+        ingestion_options.partition_count
+    )
+    if ingestion_options.partition_count == 1:
+        assert data_reader.is_sorted_by_unit_id(
+            arrow_dataset
+        ) == data_reader.is_sorted_by_unit_id(parquet_dataset)
+
+
+def test_partition_by_unit_id():
+    os.makedirs("tmp", exist_ok=True)
+    unit_ids = [f"{i:011d}" for i in range(1000)]
+    table = pyarrow.table({"unit_id": unit_ids, "value": list(range(1000))})
+    pyarrow.parquet.write_table(table, "tmp/data.parquet")
+    data = pyarrow.dataset.dataset("tmp/data.parquet")
+    partitions = data_reader.partition_by_unit_id(
+        data, ["unit_id"], Path("tmp/partitions"), 4, 100, seed=0
+    )
+    assert (
+        sorted(
+            unit_id
+            for partition in partitions
+            for unit_id in partition.to_table()["unit_id"].to_pylist()
+        )
+        == unit_ids
+    )
+    assert all(partition.count_rows() > 200 for partition in partitions)
+    # A seeded hash splits a partition of the unseeded hash again
+    repartitions = data_reader.partition_by_unit_id(
+        partitions[0], ["unit_id"], Path("tmp/repartitions"), 2, 100, seed=1
+    )
+    assert all(
+        repartition.count_rows() > partitions[0].count_rows() // 3
+        for repartition in repartitions
+    )
+
+
+@pytest.mark.parametrize(
+    "ingestion_options",
+    [
+        IngestionOptions(block_size=64, pack_digit_identifiers=True),
+        IngestionOptions(
+            block_size=64, pack_digit_identifiers=True, partition_count=2
+        ),
+        IngestionOptions(
+            block_size=64, pack_digit_identifiers=True, file_format="arrow"
+        ),
+    ],
+)
+@pytest.mark.parametrize("last_unit_id", ["00000000017", "0000000001A"])
+def test_pack_digit_identifiers(ingestion_options, last_unit_id):
+    os.makedirs("tmp", exist_ok=True)
+    unit_ids = [f"{row % 17:011d}" for row in range(99)] + [last_unit_id]
+    with open("tmp/INPUT.csv", "w") as f:
+        for row, unit_id in enumerate(unit_ids):
+            f.write(f"{unit_id};{row};2020-01-01;2020-01-02;\n")
+    seen_unit_ids = []
+    filesystem_dataset = data_reader.read_and_sanitize_csv_write_parquet(
+        Path("tmp/INPUT.csv"),
+        Path(f"tmp/tmp.{ingestion_options.file_format}"),
+        "STRING",
+        "LONG",
+        "EVENT",
+        batch_consumers=[
+            lambda table: seen_unit_ids.extend(table["unit_id"].to_pylist())
+        ],
+        ingestion_options=ingestion_options,
+    )
+    assert seen_unit_ids == unit_ids
+    assert sorted(os.listdir("tmp")) == [
+        "INPUT.csv",
+        f"tmp.{ingestion_options.file_format}",
+    ]
+    table = filesystem_dataset.to_table().sort_by("value")
+    identifier_width = data_reader.get_identifier_width(filesystem_dataset)
+    if last_unit_id.isdigit():
+        assert table.schema.field("unit_id").type == pyarrow.int64()
+        assert identifier_width == 11
+        assert (
+            data_reader.restore_leading_zeros(
+                table["unit_id"], identifier_width
+            ).to_pylist()
+            == unit_ids
+        )
+    else:
+        assert table.schema.field("unit_id").type == pyarrow.string()
+        assert identifier_width is None
+        assert table["unit_id"].to_pylist() == unit_ids
+
+
+def test_unit_id_bloom_filter():
+    bloom_filter = data_reader.UnitIdBloomFilter(0.01, capacity=1000)
+    for batch in range(10):
+        unit_ids = [str(batch * 1000 + row) for row in range(1000)]
+        if batch == 9:
+            unit_ids[:3] = ["17", "4242", "4242"]
+        bloom_filter.update(pyarrow.table({"unit_id": pyarrow.array(unit_ids)}))
+    candidates = bloom_filter.candidate_identifiers().to_pylist()
+    assert not bloom_filter.overflowed
+    assert len(bloom_filter.filters) > 1
+    assert {"17", "4242"} <= set(candidates)
+    # About 1% false positives out of 10000 unique identifiers
+    assert len(candidates) < 200
+
+
+def test_unit_id_bloom_filter_overflow(monkeypatch):
+    monkeypatch.setattr(data_reader.UnitIdBloomFilter, "MAX_CANDIDATES", 10)
+    bloom_filter = data_reader.UnitIdBloomFilter(0.01)
+    table = pyarrow.table({"unit_id": pyarrow.array(range(100))})
+    bloom_filter.update(table)
+    assert not bloom_filter.overflowed
+    bloom_filter.update(table)
+    assert bloom_filter.overflowed
+    assert bloom_filter.filters == []
+
+
+def test_unit_id_bloom_filter_invalid_rate():
+    with pytest.raises(ValueError):
+        data_reader.UnitIdBloomFilter(1.0)
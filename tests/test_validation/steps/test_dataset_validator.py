@@ -1,7 +1,12 @@
+import os
+
+import pyarrow
 import pytest
+from pyarrow import dataset
 
 from microdata_tools.validation.exceptions import ValidationError
-from microdata_tools.validation.steps import dataset_validator
+from microdata_tools.validation.model.ingestion import IngestionOptions
+from microdata_tools.validation.steps import data_reader, dataset_validator
 from tests import test_data
 
 
@@ -30,6 +35,62 @@ def test_measure_code_list_validation():
     assert e.value.errors == ["Error for identifier 4: 3 is not in code list"]
 
 
+def test_measure_code_list_validity_periods():
+    code_list = test_data.FIXED_STRING_CODELIST_WITH_PERIODS
+    sentinel_list = test_data.FIXED_STRING_CODELIST_SENTINEL
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            test_data.FIXED_STRING_CODELIST_DS(),
+            "STRING",
+            code_list,
+            sentinel_list,
+            "FIXED",
+        )
+    assert e.value.errors == [
+        "Error for identifier 2: 1 is not in code list on 2020-01-01",
+        "Error for identifier 4: 1 is not in code list on 2020-01-01",
+    ]
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            test_data.EVENT_STRING_CODELIST_PERIODS_DS(),
+            "STRING",
+            code_list,
+            sentinel_list,
+            "EVENT",
+        )
+    assert e.value.errors == [
+        "Error for identifier 4: 1 is not in code list on 2020-02-08",
+        "Error for identifier 5: 3 is not in code list on 2020-12-04",
+    ]
+
+
+def test_invalid_code_date_mask():
+    periods = dataset_validator._code_validity_periods(
+        test_data.FIXED_STRING_CODELIST_WITH_PERIODS,
+        [{"code": "2"}],
+    )
+    invalid_mask = dataset_validator._invalid_code_date_mask(
+        periods,
+        pyarrow.array(["1", "1", "1", "1", "2", "3", "3", "4", None, "1"]),
+        pyarrow.array(
+            [18261, 18262, 18413, 18414, 0, 18627, 18628, 0, 0, None],
+            pyarrow.int32(),
+        ),
+    )
+    assert invalid_mask.to_pylist() == [
+        False,
+        True,
+        True,
+        False,
+        False,
+        True,
+        False,
+        False,
+        False,
+        False,
+    ]
+
+
 def test_measure_data_type_string_validation():
     dataset_validator.validate_dataset(
         test_data.FIXED_STRING_DS(),
@@ -143,7 +204,21 @@ def test_temporality_fixed():
             None,
             "FIXED",
         )
-    assert e.value.errors == ["Duplicate identifiers in #1 column"]
+    assert e.value.errors == [
+        "Duplicate identifiers in #1 column for row with identifier: 3"
+    ]
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            test_data.FIXED_INVALID_LONG_DUPLICATES_DS(),
+            "STRING",
+            None,
+            None,
+            "FIXED",
+        )
+    assert e.value.errors == [
+        "Duplicate identifiers in #1 column for row with identifier: 3",
+        "Duplicate identifiers in #1 column for row with identifier: 20",
+    ]
 
 
 def test_temporality_status():
@@ -175,7 +250,22 @@ def test_temporality_status():
             "STATUS",
         )
     assert e.value.errors == [
-        "Same unit_id (#1 Column) has duplicate dates (#3 and #4 column)"
+        "Same unit_id (#1 Column) has duplicate dates (#3 and #4 column) "
+        "for row with identifier: 3 and date: 2020-12-30"
+    ]
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            test_data.STATUS_INVALID_MULTIPLE_DUPLICATES_DS(),
+            "STRING",
+            None,
+            None,
+            "STATUS",
+        )
+    assert e.value.errors == [
+        "Same unit_id (#1 Column) has duplicate dates (#3 and #4 column) "
+        "for row with identifier: 1 and date: 2020-12-30",
+        "Same unit_id (#1 Column) has duplicate dates (#3 and #4 column) "
+        "for row with identifier: 2 and date: 2020-12-30",
     ]
 
 
@@ -239,6 +329,27 @@ def test_temporality_event():
         )
     assert len(e.value.errors) == 50
 
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            test_data.EVENT_INVALID_MULTIPLE_OVERLAPS_DS(),
+            "STRING",
+            None,
+            None,
+            "EVENT",
+        )
+    assert e.value.errors == [
+        (
+            'Invalid overlapping timespans for identifier "1": '
+            "timespan: (2020-12-30 - 2021-02-07) overlaps with "
+            "timespan: (2021-02-02 - 2021-02-12)"
+        ),
+        (
+            'Invalid overlapping timespans for identifier "2": '
+            "timespan: (2020-12-30 - ) overlaps with "
+            "timespan: (2021-02-22 - )"
+        ),
+    ]
+
 
 def test_temporality_accumulated():
     dataset_validator.validate_dataset(
@@ -300,3 +411,370 @@ def test_max_50_errors():
             "FIXED",
         )
         assert len(e.value.errors) == 50
+
+
+def test_row_level_error_precedence():
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            test_data.MIXED_ERRORS_DS(),
+            "STRING",
+            None,
+            None,
+            "FIXED",
+        )
+    assert e.value.errors == [
+        "Invalid value in #2 column for row with identifier: 3"
+    ]
+
+
+def test_long_identifier_validation():
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            test_data.FIXED_LONG_IDENTIFIER_DS(),
+            "STRING",
+            None,
+            None,
+            "FIXED",
+        )
+    assert e.value.errors == [
+        "Invalid identifier in #1 column for row with identifier: None"
+    ]
+
+
+def test_max_errors():
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            test_data.TOO_MANY_ERRORS_DS(),
+            "STRING",
+            test_data.TOO_MANY_ERRORS_CODELIST,
+            None,
+            "ACCUMULATED",
+            max_errors=10,
+        )
+    assert e.value.errors == [
+        f"Error for identifier {i}: {i} is not in code list"
+        for i in [0] + list(range(2, 11))
+    ]
+
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            test_data.EVENT_TOO_MANY_ERRORS_DS(),
+            "STRING",
+            None,
+            None,
+            "EVENT",
+            max_errors=75,
+        )
+    assert len(e.value.errors) == 75
+
+
+def test_out_of_core_validation_spill_directory(monkeypatch):
+    data = test_data.FIXED_INVALID_SKEWED_DUPLICATES_DS()
+    spill_directory = test_data.PARQUET_DIR / "FIXED.spill"
+    depths = []
+    find_spilled = dataset_validator._find_spilled
+
+    def find_spilled_at_depth(*args, depth=0):
+        depths.append(depth)
+        return find_spilled(*args, depth=depth)
+
+    monkeypatch.setattr(
+        dataset_validator, "_find_spilled", find_spilled_at_depth
+    )
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            data,
+            "STRING",
+            None,
+            None,
+            "FIXED",
+            memory_limit=dataset_validator._estimated_memory_bytes(
+                data, ["unit_id"]
+            )
+            // 4,
+            spill_directory=spill_directory,
+        )
+    assert e.value.errors == [
+        f"Duplicate identifiers in #1 column for row with identifier: {i}"
+        for i in ["1", "30", "7"]
+    ]
+    # The skewed identifier is split again until it is sorted instead
+    assert max(depths) == dataset_validator.MAX_SPILL_DEPTH
+    assert os.listdir(spill_directory) == []
+
+
+@pytest.mark.parametrize(
+    "temporality_type, rows, expected_errors",
+    [
+        (
+            "FIXED",
+            [("007", "", "2020-01-01"), ("007", "", "2020-01-01")],
+            ["Duplicate identifiers in #1 column for row with identifier: 007"],
+        ),
+        (
+            "EVENT",
+            [
+                ("042", "2020-01-01", "2020-01-03"),
+                ("042", "2020-01-02", ""),
+            ],
+            [
+                'Invalid overlapping timespans for identifier "042": '
+                "timespan: (2020-01-01 - 2020-01-03) overlaps with "
+                "timespan: (2020-01-02 - )"
+            ],
+        ),
+        (
+            "EVENT",
+            [("042", "2020-01-02", "2020-01-01")],
+            ["Invalid #3 and/or #4 columns for row with identifier: 042"],
+        ),
+    ],
+)
+def test_packed_identifier_validation(
+    tmp_path, temporality_type, rows, expected_errors
+):
+    with open(tmp_path / "INPUT.csv", "w") as f:
+        for unit_id, start, stop in rows:
+            f.write(f"{unit_id};1;{start};{stop};\n")
+    data = data_reader.read_and_sanitize_csv_write_parquet(
+        tmp_path / "INPUT.csv",
+        tmp_path / "INPUT.parquet",
+        "STRING",
+        "LONG",
+        temporality_type,
+        ingestion_options=IngestionOptions(pack_digit_identifiers=True),
+    )
+    assert data.schema.field("unit_id").type == pyarrow.int64()
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            data, "LONG", None, None, temporality_type
+        )
+    assert e.value.errors == expected_errors
+
+
+@pytest.mark.parametrize(
+    "unit_ids",
+    [
+        # Dense identifiers are counted with numpy.bincount
+        [3, 1, 2, 1, 3, 1, 2, 3],
+        # Sparse identifiers are counted with a hash aggregation
+        [3_000_000, 1, 2, 1, 3_000_000, 1, 2, 3_000_000],
+        # Identifiers that span the int64 range are ranked first
+        [2**62, -(2**62), 2, -(2**62), 2**62, -(2**62), 2, 2**62],
+        ["c", "a", "b", "a", "c", "a", "b", "c"],
+    ],
+)
+def test_find_duplicate_status_dates(unit_ids):
+    status_rows = pyarrow.table(
+        {
+            "unit_id": unit_ids,
+            "start_epoch_days": pyarrow.array(
+                [-400, 0, 0, 0, -400, 18000, 1, 18000], pyarrow.int16()
+            ),
+        }
+    )
+    duplicates = [
+        {"unit_id": unit_ids[1], "start_epoch_days": 0},
+        {"unit_id": unit_ids[0], "start_epoch_days": -400},
+    ]
+    assert (
+        dataset_validator._find_duplicate_status_dates(status_rows, 50)
+        == duplicates
+    )
+    assert (
+        dataset_validator._find_duplicate_status_dates(status_rows, 1)
+        == duplicates[:1]
+    )
+
+
+def test_unit_id_codes():
+    unit_id = pyarrow.chunked_array(
+        [
+            pyarrow.array(["b", "c", "b"]).dictionary_encode(),
+            pyarrow.array(["a", None, "c"]).dictionary_encode(),
+        ]
+    )
+    codes, identifiers = dataset_validator._unit_id_codes(unit_id)
+    assert codes.to_pylist() == [1, 2, 1, 0, None, 2]
+    assert identifiers.to_pylist() == ["a", "b", "c"]
+
+
+INVALID_DATASETS = [
+    (test_data.FIXED_INVALID_DUPLICATES_DS, "FIXED"),
+    (test_data.FIXED_INVALID_LONG_DUPLICATES_DS, "FIXED"),
+    (test_data.FIXED_INVALID_TRIPLICATES_DS, "FIXED"),
+    (test_data.FIXED_INVALID_SKEWED_DUPLICATES_DS, "FIXED"),
+    (test_data.STATUS_INVALID_MULTIPLE_DUPLICATES_DS, "STATUS"),
+    (test_data.EVENT_INVALID_MULTIPLE_OVERLAPS_DS, "EVENT"),
+    (test_data.EVENT_TOO_MANY_ERRORS_DS, "EVENT"),
+    (test_data.ACCUMULATED_INVALID_TIMESPANS_DS, "ACCUMULATED"),
+]
+
+
+def _bloom_filter(data: dataset.Dataset) -> data_reader.UnitIdBloomFilter:
+    bloom_filter = data_reader.UnitIdBloomFilter(0.01)
+    for batch in data.to_batches(columns=["unit_id"]):
+        bloom_filter.update(pyarrow.Table.from_batches([batch]))
+    return bloom_filter
+
+
+def _cross_row_memory_bytes(data: dataset.Dataset) -> int:
+    return dataset_validator._estimated_memory_bytes(
+        data, ["unit_id", "start_epoch_days", "stop_epoch_days"]
+    )
+
+
+# Each layout returns the dataset to validate and the extra arguments
+# to validate it with
+LAYOUTS = {
+    "sorted": lambda data: (test_data._sorted_dataset(data), {}),
+    "partitioned": lambda data: (test_data._partitioned_dataset(data, 3), {}),
+    "in_memory": lambda data: (dataset.dataset(data.to_table()), {}),
+    "memory_limit_half": lambda data: (
+        data,
+        {"memory_limit": _cross_row_memory_bytes(data) // 2},
+    ),
+    "memory_limit_quarter": lambda data: (
+        data,
+        {"memory_limit": _cross_row_memory_bytes(data) // 4},
+    ),
+    "bloom_filter": lambda data: (
+        data,
+        {"unit_id_bloom_filter": _bloom_filter(data)},
+    ),
+}
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+@pytest.mark.parametrize("invalid_dataset, temporality_type", INVALID_DATASETS)
+def test_layout_equivalence(invalid_dataset, temporality_type, layout):
+    data = invalid_dataset()
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            data, "STRING", None, None, temporality_type, max_errors=7
+        )
+    layout_data, layout_kwargs = LAYOUTS[layout](data)
+    with pytest.raises(ValidationError) as layout_e:
+        dataset_validator.validate_dataset(
+            layout_data,
+            "STRING",
+            None,
+            None,
+            temporality_type,
+            max_errors=7,
+            **layout_kwargs,
+        )
+    assert layout_e.value.errors == e.value.errors
+
+
+@pytest.mark.parametrize(
+    "get_dataset, temporality_type, code_list",
+    [
+        # Row level errors of ranges of row groups are merged in order
+        (
+            lambda: test_data._sorted_dataset(test_data.TOO_MANY_ERRORS_DS()),
+            "ACCUMULATED",
+            test_data.TOO_MANY_ERRORS_CODELIST,
+        ),
+        # Cross row findings of partitions are merged in order
+        (
+            lambda: test_data._partitioned_dataset(
+                test_data.EVENT_TOO_MANY_ERRORS_DS(), 3
+            ),
+            "EVENT",
+            None,
+        ),
+    ],
+)
+def test_parallel_validation(get_dataset, temporality_type, code_list):
+    data = get_dataset()
+    with pytest.raises(ValidationError) as e:
+        dataset_validator.validate_dataset(
+            data, "STRING", code_list, None, temporality_type, max_errors=7
+        )
+    with pytest.raises(ValidationError) as parallel_e:
+        dataset_validator.validate_dataset(
+            data,
+            "STRING",
+            code_list,
+            None,
+            temporality_type,
+            max_errors=7,
+            workers=2,
+        )
+    assert parallel_e.value.errors == e.value.errors
+
+
+def test_sorted_dataset_is_detected():
+    data = test_data.EVENT_INVALID_MULTIPLE_OVERLAPS_DS()
+    assert not data_reader.is_sorted_by_unit_id(data)
+    assert data_reader.is_sorted_by_unit_id(test_data._sorted_dataset(data))
+
+
+def test_partitioned_dataset_is_detected():
+    data = test_data.STATUS_INVALID_MULTIPLE_DUPLICATES_DS()
+    partitioned_data = test_data._partitioned_dataset(data, 3)
+    assert len(data_reader.get_unit_id_partitions(data)) == 1
+    assert len(data_reader.get_unit_id_partitions(partitioned_data)) == 3
+
+
+def test_dictionary_encoded_read():
+    data = test_data.FIXED_INVALID_DUPLICATES_DS()
+    assert pyarrow.types.is_dictionary(
+        data_reader.read_dictionary_encoded(data, ["unit_id"])
+        .schema.field("unit_id")
+        .type
+    )
+
+
+def test_out_of_core_validation_removes_spilled_files():
+    data = test_data.FIXED_INVALID_SKEWED_DUPLICATES_DS()
+    data_directory = os.path.dirname(data.files[0])
+    data_directory_files = sorted(os.listdir(data_directory))
+    with pytest.raises(ValidationError):
+        dataset_validator.validate_dataset(
+            data,
+            "STRING",
+            None,
+            None,
+            "FIXED",
+            memory_limit=_cross_row_memory_bytes(data) // 4,
+        )
+    assert sorted(os.listdir(data_directory)) == data_directory_files
+
+
+@pytest.mark.parametrize(
+    "dataset_with_duplicates",
+    [
+        test_data.FIXED_INVALID_DUPLICATES_DS,
+        test_data.FIXED_INVALID_SKEWED_DUPLICATES_DS,
+    ],
+)
+def test_bloom_filter_candidates(dataset_with_duplicates):
+    data = dataset_with_duplicates()
+    bloom_filter = _bloom_filter(data)
+    duplicates = (
+        data.to_table(columns=["unit_id"])
+        .group_by("unit_id")
+        .aggregate([([], "count_all")])
+        .filter(pyarrow.compute.field("count_all") > 1)["unit_id"]
+    )
+    candidates = bloom_filter.candidate_identifiers()
+    assert not bloom_filter.overflowed
+    assert set(duplicates.to_pylist()) <= set(candidates.to_pylist())
+    assert len(candidates) < data.count_rows()
+
+
+def test_bloom_filter_validation_without_candidates():
+    bloom_filter = data_reader.UnitIdBloomFilter(0.01)
+    data = test_data.FIXED_STRING_DS()
+    bloom_filter.update(data.to_table(columns=["unit_id"]))
+    assert len(bloom_filter.candidate_identifiers()) == 0
+    dataset_validator.validate_dataset(
+        data,
+        "STRING",
+        None,
+        None,
+        "FIXED",
+        unit_id_bloom_filter=bloom_filter,
+    )
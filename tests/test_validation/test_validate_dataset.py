@@ -1,7 +1,15 @@
+import gzip
 import json
 import os
+import shutil
+from pathlib import Path
 
-from microdata_tools import validate_dataset
+import pyarrow
+import pytest
+from pyarrow import csv
+
+from microdata_tools import IngestionOptions, validate_dataset, validate_table
+from microdata_tools.validation.steps import data_reader
 
 RESOURCE_DIR = "tests/resources/validation/validate_dataset"
 INPUT_DIR = f"{RESOURCE_DIR}/input_directory"
@@ -16,6 +24,7 @@ VALID_DATASET_NAMES = [
 ]
 NO_SUCH_DATASET_NAME = "NO_SUCH_DATASET"
 WRONG_DELIMITER_DATASET_NAME = "WRONG_DELIMITER_DATASET"
+INVALID_DATASET_NAME = "INVALID_PERSON_MOR"
 
 
 def test_validate_valid_dataset():
@@ -45,6 +54,263 @@ def test_validate_valid_dataset():
         assert actual_metadata == expected_metadata
 
 
+def test_validate_invalid_dataset():
+    data_errors = validate_dataset(
+        INVALID_DATASET_NAME,
+        working_directory=WORKING_DIR,
+        input_directory=INPUT_DIR,
+    )
+    assert data_errors == [
+        "Invalid value in #2 column for row with identifier: 00000000000007"
+    ]
+    assert get_working_directory_files() == [".gitkeep"]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        pytest.param(
+            {"ingestion_options": IngestionOptions(partition_count=4)},
+            id="partitioned",
+        ),
+        pytest.param(
+            {"ingestion_options": IngestionOptions(file_format="arrow")},
+            id="arrow",
+        ),
+        pytest.param(
+            {
+                "ingestion_options": IngestionOptions(
+                    pack_digit_identifiers=True
+                )
+            },
+            id="packed",
+        ),
+        pytest.param({"memory_limit": 1000}, id="memory_limit"),
+        pytest.param(
+            {"bloom_filter_false_positive_rate": 0.01}, id="bloom_filter"
+        ),
+        pytest.param(
+            {
+                "ingestion_options": IngestionOptions(
+                    pack_digit_identifiers=True
+                ),
+                "bloom_filter_false_positive_rate": 0.01,
+            },
+            id="packed_bloom_filter",
+        ),
+    ],
+)
+def test_validate_dataset_with_options(options):
+    for dataset_name in VALID_DATASET_NAMES + [INVALID_DATASET_NAME]:
+        data_errors = validate_dataset(
+            dataset_name,
+            working_directory=WORKING_DIR,
+            input_directory=INPUT_DIR,
+        )
+        options_data_errors = validate_dataset(
+            dataset_name,
+            working_directory=WORKING_DIR,
+            input_directory=INPUT_DIR,
+            **options,
+        )
+        assert options_data_errors == data_errors
+        assert get_working_directory_files() == [".gitkeep"]
+
+
+def test_validate_dataset_removes_spilled_files():
+    dataset_name = VALID_DATASET_NAMES[0]
+    # Left behind by an interrupted validation
+    os.makedirs(f"{WORKING_DIR}/{dataset_name}.spill/spill_interrupted")
+    data_errors = validate_dataset(
+        dataset_name,
+        working_directory=WORKING_DIR,
+        input_directory=INPUT_DIR,
+        memory_limit=1000,
+    )
+    assert not data_errors
+    assert get_working_directory_files() == [".gitkeep"]
+
+
+def _read_input_table(dataset_name: str) -> pyarrow.Table:
+    return csv.read_csv(
+        f"{INPUT_DIR}/{dataset_name}/{dataset_name}.csv",
+        parse_options=csv.ParseOptions(delimiter=";"),
+        read_options=csv.ReadOptions(
+            column_names=["unit_id", "value", "start", "stop", "attributes"]
+        ),
+        convert_options=csv.ConvertOptions(
+            column_types={"unit_id": pyarrow.string()}
+        ),
+    )
+
+
+def _read_input_metadata(dataset_name: str) -> dict:
+    with open(
+        f"{INPUT_DIR}/{dataset_name}/{dataset_name}.json", "r", encoding="utf-8"
+    ) as f:
+        return json.load(f)
+
+
+def test_validate_table():
+    for dataset_name in VALID_DATASET_NAMES + [INVALID_DATASET_NAME]:
+        data_errors = validate_dataset(
+            dataset_name,
+            working_directory=WORKING_DIR,
+            input_directory=INPUT_DIR,
+        )
+        metadata_dict = _read_input_metadata(dataset_name)
+        table = _read_input_table(dataset_name)
+        assert validate_table(metadata_dict, table) == data_errors
+        assert (
+            validate_table(
+                metadata_dict,
+                pyarrow.RecordBatchReader.from_batches(
+                    table.schema, table.to_batches(max_chunksize=3)
+                ),
+            )
+            == data_errors
+        )
+        assert metadata_dict == _read_input_metadata(dataset_name)
+    assert get_working_directory_files() == [".gitkeep"]
+
+
+@pytest.mark.parametrize("max_errors", [0, -1])
+def test_invalid_max_errors(max_errors):
+    with pytest.raises(ValueError):
+        validate_dataset(
+            INVALID_DATASET_NAME,
+            working_directory=WORKING_DIR,
+            input_directory=INPUT_DIR,
+            max_errors=max_errors,
+        )
+    with pytest.raises(ValueError):
+        validate_table(
+            _read_input_metadata(INVALID_DATASET_NAME),
+            _read_input_table(INVALID_DATASET_NAME),
+            max_errors=max_errors,
+        )
+    assert get_working_directory_files() == [".gitkeep"]
+
+
+def test_validate_table_missing_columns():
+    table = _read_input_table(VALID_DATASET_NAMES[0]).drop_columns(["stop"])
+    assert validate_table(
+        _read_input_metadata(VALID_DATASET_NAMES[0]), table
+    ) == ["Missing columns in data: ['stop']"]
+
+
+def test_validate_compressed_dataset():
+    dataset_name = VALID_DATASET_NAMES[0]
+    compressed_input_dir = f"{WORKING_DIR}/compressed_input_directory"
+    os.makedirs(f"{compressed_input_dir}/{dataset_name}")
+    shutil.copy(
+        f"{INPUT_DIR}/{dataset_name}/{dataset_name}.json",
+        f"{compressed_input_dir}/{dataset_name}/{dataset_name}.json",
+    )
+    with (
+        open(f"{INPUT_DIR}/{dataset_name}/{dataset_name}.csv", "rb") as f,
+        pyarrow.CompressedOutputStream(
+            f"{compressed_input_dir}/{dataset_name}/{dataset_name}.csv.gz",
+            "gzip",
+        ) as compressed_f,
+    ):
+        compressed_f.write(f.read())
+    data_errors = validate_dataset(
+        dataset_name,
+        working_directory=WORKING_DIR,
+        keep_temporary_files=True,
+        input_directory=compressed_input_dir,
+    )
+    assert not data_errors
+    with open(f"{WORKING_DIR}/{dataset_name}.json", "r", encoding="utf-8") as f:
+        actual_metadata = json.load(f)
+    with open(
+        f"{EXPECTED_DIR}/{dataset_name}.json", "r", encoding="utf-8"
+    ) as f:
+        expected_metadata = json.load(f)
+    assert actual_metadata == expected_metadata
+
+
+def test_validate_truncated_compressed_dataset():
+    dataset_name = VALID_DATASET_NAMES[0]
+    compressed_input_dir = f"{WORKING_DIR}/compressed_input_directory"
+    os.makedirs(f"{compressed_input_dir}/{dataset_name}")
+    shutil.copy(
+        f"{INPUT_DIR}/{dataset_name}/{dataset_name}.json",
+        f"{compressed_input_dir}/{dataset_name}/{dataset_name}.json",
+    )
+    compressed_csv = gzip.compress(
+        Path(f"{INPUT_DIR}/{dataset_name}/{dataset_name}.csv").read_bytes()
+    )
+    Path(
+        f"{compressed_input_dir}/{dataset_name}/{dataset_name}.csv.gz"
+    ).write_bytes(compressed_csv[: len(compressed_csv) // 2])
+    data_errors = validate_dataset(
+        dataset_name,
+        working_directory=WORKING_DIR,
+        input_directory=compressed_input_dir,
+    )
+    assert data_errors == [
+        "Could not decompress gzip csv file: Truncated compressed stream"
+    ]
+    assert sorted(get_working_directory_files()) == [
+        ".gitkeep",
+        "compressed_input_directory",
+    ]
+
+
+@pytest.mark.parametrize(
+    "ingestion_options",
+    [IngestionOptions(), IngestionOptions(pack_digit_identifiers=True)],
+)
+def test_validate_dataset_with_cache(monkeypatch, ingestion_options):
+    cache_dir = f"{WORKING_DIR}/cache"
+    for dataset_name in VALID_DATASET_NAMES + [INVALID_DATASET_NAME]:
+        data_errors = validate_dataset(
+            dataset_name,
+            working_directory=WORKING_DIR,
+            input_directory=INPUT_DIR,
+        )
+        assert (
+            validate_dataset(
+                dataset_name,
+                working_directory=WORKING_DIR,
+                input_directory=INPUT_DIR,
+                ingestion_options=ingestion_options,
+                cache_directory=cache_dir,
+            )
+            == data_errors
+        )
+        assert sorted(get_working_directory_files()) == [".gitkeep", "cache"]
+        with monkeypatch.context() as m:
+            m.setattr(
+                data_reader,
+                "read_and_sanitize_csv_write_parquet",
+                lambda *args, **kwargs: pytest.fail("CSV was read again"),
+            )
+            cached_data_errors = validate_dataset(
+                dataset_name,
+                working_directory=WORKING_DIR,
+                input_directory=INPUT_DIR,
+                ingestion_options=ingestion_options,
+                keep_temporary_files=True,
+                cache_directory=cache_dir,
+            )
+        assert cached_data_errors == data_errors
+        if not data_errors:
+            with open(
+                f"{WORKING_DIR}/{dataset_name}.json", "r", encoding="utf-8"
+            ) as f:
+                actual_metadata = json.load(f)
+            with open(
+                f"{EXPECTED_DIR}/{dataset_name}.json", "r", encoding="utf-8"
+            ) as f:
+                expected_metadata = json.load(f)
+            assert actual_metadata == expected_metadata
+            os.remove(f"{WORKING_DIR}/{dataset_name}.json")
+            os.remove(f"{WORKING_DIR}/{dataset_name}.parquet")
+
+
 def test_invalid_dataset_name():
     data_errors = validate_dataset(
         "1_INVALID_DATASET_NAME",
@@ -119,5 +385,7 @@ def get_working_directory_files() -> list:
 
 def teardown_function():
     for file in get_working_directory_files():
-        if file != ".gitkeep":
+        if os.path.isdir(f"{WORKING_DIR}/{file}"):
+            shutil.rmtree(f"{WORKING_DIR}/{file}")
+        elif file != ".gitkeep":
             os.remove(f"{WORKING_DIR}/{file}")